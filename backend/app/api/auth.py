@@ -4,14 +4,16 @@ Authentication API endpoints.
 
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 from fastapi.responses import JSONResponse
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.core.presence import presence
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    password_hasher,
     create_access_token,
     get_current_user,
+    invalidate_cached_user,
 )
 from app.schemas.user import UserCreate, UserLogin, UserOut, Token, LoginOut
 from app.db.database import get_db
@@ -23,26 +25,27 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 @router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
 async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user."""
-    # Check if user already exists
-    result = await db.execute(select(User).where(User.username == user.username))
-    existing_user = result.scalar_one_or_none()
+    # Insert in one statement; the unique username decides races between sign-ups
+    result = await db.execute(
+        insert(User)
+        .values(
+            username=user.username,
+            hashed_password=await password_hasher.hash(user.password),
+            is_active=True,
+        )
+        .on_conflict_do_nothing(index_elements=[User.username])
+        .returning(User)
+    )
+    new_user = result.scalar_one_or_none()
 
-    if existing_user:
+    if new_user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered",
         )
 
-    # Create new user with hashed password
-    new_user = User(
-        username=user.username,
-        hashed_password=get_password_hash(user.password),
-        is_active=True,
-    )
-
-    db.add(new_user)
     await db.commit()
-    await db.refresh(new_user)
+    invalidate_cached_user(new_user.username)
 
     return new_user
 
@@ -63,17 +66,16 @@ async def login_user(
         )
 
     # Verify password
-    if not verify_password(user.password, db_user.hashed_password):
+    if not await password_hasher.verify(user.password, db_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
         )
 
-    # Update is_active to True on login
-    db_user.is_active = True
-
     # Create access token
-    access_token = create_access_token(data={"sub": db_user.username})
+    access_token = create_access_token(
+        data={"sub": db_user.username, "uid": db_user.id}
+    )
 
     # Set cookie (HTTP-only, secure)
     response.set_cookie(
@@ -85,8 +87,12 @@ async def login_user(
         max_age=60 * 60 * 24,  # 24 hours
     )
 
-    await db.commit()
-    await db.refresh(db_user)
+    # Update is_active to True on login, skipping the write if it already is
+    if not db_user.is_active:
+        db_user.is_active = True
+        await db.commit()
+        invalidate_cached_user(db_user.username)
+    presence.mark_online(db_user.id, persisted=True)
 
     return LoginOut(message="Login successful", user=UserOut.model_validate(db_user))
 
@@ -99,7 +105,8 @@ async def logout_user(
 ):
     db_user.is_active = False
     await db.commit()
-    await db.refresh(db_user)
+    invalidate_cached_user(db_user.username)
+    presence.mark_offline(db_user.id, persisted=True)
 
     response.delete_cookie(key="access_token")
     return {"message": "Logged out successfully"}
@@ -0,0 +1,72 @@
+"""
+Conversation list API endpoints.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+)
+from app.core.security import get_current_principal
+from app.db.database import get_db
+from app.models import Conversation, User
+from app.schemas.conversation import ConversationListOut, ConversationSummary
+from app.schemas.user import Principal
+
+router = APIRouter(prefix="/conversations", tags=["conversations"])
+
+
+@router.get("", response_model=ConversationListOut)
+async def get_conversations(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Get the current user's conversations, most recent first, one page at a time."""
+    # One range scan on ix_conversations_owner_recent, whatever the message history
+    stmt = (
+        select(Conversation, User.username)
+        .join(User, User.id == Conversation.peer_id)
+        .where(Conversation.owner_id == current_user.id)
+    )
+    if cursor:
+        last_message_at, peer_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(Conversation.last_message_at, Conversation.peer_id)
+            < tuple_(last_message_at, peer_id)
+        )
+    stmt = stmt.order_by(
+        Conversation.last_message_at.desc(), Conversation.peer_id.desc()
+    ).limit(limit + 1)
+
+    rows = (await db.execute(stmt)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        next_cursor = encode_cursor(last.last_message_at, last.peer_id)
+
+    conversations = [
+        ConversationSummary(
+            peer_id=conversation.peer_id,
+            peer_username=peer_username,
+            last_message_id=conversation.last_message_id,
+            last_sender_id=conversation.last_sender_id,
+            last_message_preview=conversation.last_message_preview,
+            last_message_at=conversation.last_message_at,
+            unread_count=conversation.unread_count,
+        )
+        for conversation, peer_username in rows
+    ]
+    return ConversationListOut(
+        conversations=conversations, total=len(conversations), next_cursor=next_cursor
+    )
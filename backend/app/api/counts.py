@@ -0,0 +1,37 @@
+"""
+Unread count API endpoints.
+"""
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.security import get_current_principal
+from app.db.database import get_db
+from app.models import UserCounters
+from app.schemas.counts import CountsOut
+from app.schemas.user import Principal
+
+router = APIRouter(prefix="/counts", tags=["counts"])
+
+
+@router.get("", response_model=CountsOut)
+async def get_counts(
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Get unread message and notification counts with one primary-key lookup."""
+    result = await db.execute(
+        select(UserCounters.unread_messages, UserCounters.unread_notifications).where(
+            UserCounters.user_id == current_user.id
+        )
+    )
+    counts = result.one_or_none()
+
+    # No row yet means nothing has ever been counted for this user
+    if counts is None:
+        return CountsOut(unread_messages=0, unread_notifications=0)
+    return CountsOut(
+        unread_messages=counts.unread_messages,
+        unread_notifications=counts.unread_notifications,
+    )
@@ -3,96 +3,492 @@ Message API endpoints.
 """
 
 from datetime import datetime
+from typing import Iterable, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import and_, func, insert, literal, or_, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import aliased
 
-from app.core.security import get_current_user
+from app.core.conversations import record_messages, refresh_unread_counts
+from app.core.counters import (
+    add_unread,
+    lock_counters,
+    next_notification_seqs,
+    sync_unread_messages,
+)
+from app.core.notifications import (
+    MESSAGE_READ,
+    notify_new_messages,
+    render_notification,
+    select_notifications,
+)
+from app.core.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+)
+from app.core.push import publish_event, register_loader
+from app.core.security import get_current_principal
 from app.db.database import get_db
-from app.models import User, Message, Notification
-from app.schemas.message import MessageCreate, MessageOut, InboxOut, OutboxOut, ReadReceipt
+from app.models import Conversation, ConversationReadState, User, Message, Notification
+from app.schemas.message import (
+    BatchReadReceipt,
+    BatchReadRequest,
+    ConversationOut,
+    InboxOut,
+    MessageCreate,
+    MessageMulticastCreate,
+    MessageOut,
+    MulticastOut,
+    OutboxOut,
+    ReadReceipt,
+    RecipientResult,
+)
+from app.schemas.push import MessageReadEvent, NewMessageEvent, NotificationEvent
+from app.schemas.user import Principal
 
 router = APIRouter(prefix="/messages", tags=["messages"])
 
 
+def _read_state_join(message=Message):
+    """Match a message to its receiver's watermark for the sender.
+
+    A message is read once that watermark has reached it.
+    """
+    return and_(
+        ConversationReadState.reader_id == message.receiver_id,
+        ConversationReadState.peer_id == message.sender_id,
+    )
+
+
+_unread = or_(
+    ConversationReadState.last_read_message_id.is_(None),
+    Message.id > ConversationReadState.last_read_message_id,
+)
+
+
+def _push_new_messages(messages: Iterable[MessageOut]) -> None:
+    """Push committed messages to their receivers' open connections."""
+    for message in messages:
+        publish_event(
+            message.receiver_id,
+            NewMessageEvent(message=message).model_dump(mode="json"),
+            ref_id=message.id,
+        )
+
+
+def _push_read_receipt(
+    sender_id: int, reader_id: int, message_ids: list[int], read_at: datetime
+) -> None:
+    """Push a committed read receipt to the sender's open connections."""
+    publish_event(
+        sender_id,
+        MessageReadEvent(
+            reader_id=reader_id, message_ids=sorted(message_ids), read_at=read_at
+        ).model_dump(mode="json"),
+    )
+
+
+def _push_notifications(notifications: Iterable[Notification], actor: Principal) -> None:
+    """Push committed notifications caused by actor to their users' open streams."""
+    for notification in notifications:
+        publish_event(
+            notification.user_id,
+            NotificationEvent(
+                notification=render_notification(notification, actor.username)
+            ).model_dump(mode="json"),
+            ref_id=notification.id,
+        )
+
+
 @router.post("/send")
 async def send_message(
     message: MessageCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Send a message to another user."""
-    # Find the recipient
-    result = await db.execute(select(User).where(User.id == message.to_user_id))
-    receiver = result.scalar_one_or_none()
+    # Insert only if the recipient exists; one statement replaces SELECT + INSERT + refresh
+    result = await db.execute(
+        insert(Message)
+        .from_select(
+            ["sender_id", "receiver_id", "content"],
+            select(
+                literal(current_user.id), User.id, literal(message.content)
+            ).where(User.id == message.to_user_id),
+        )
+        .returning(Message)
+    )
+    new_message = result.scalar_one_or_none()
 
-    if not receiver:
+    if not new_message:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Recipient not found"
         )
 
-    # Create the message
-    new_message = Message(
-        sender_id=current_user.id,
-        receiver_id=message.to_user_id,
-        content=message.content
+    # Notify the receiver (or grow their unread notification from this sender)
+    # in the same transaction
+    notifications = await notify_new_messages(db, [new_message])
+    await record_messages(db, [new_message])
+    await add_unread(
+        db,
+        messages={new_message.receiver_id: 1},
+        notifications={n.user_id: 1 for n in notifications if n.count == 1},
     )
-
-    db.add(new_message)
     await db.commit()
-    await db.refresh(new_message)
 
-    # Create notification for the receiver (new message alert)
-    notification = Notification(
-        user_id=receiver.id,
-        notification_type="new_message",
-        title="New Message",
-        message=f"{current_user.username} sent you a message",
-        related_id=new_message.id
+    message_out = MessageOut.model_validate(new_message)
+    _push_new_messages([message_out])
+    _push_notifications(notifications, current_user)
+    return message_out
+
+
+@router.post("/send-many", response_model=MulticastOut)
+async def send_message_to_many(
+    message: MessageMulticastCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Send the same message to several users in one transaction."""
+    # Keep request order but send at most once per recipient
+    recipient_ids = list(dict.fromkeys(message.to_user_ids))
+
+    result = await db.execute(select(User.id).where(User.id.in_(recipient_ids)))
+    existing = set(result.scalars().all())
+    receivers = [user_id for user_id in recipient_ids if user_id in existing]
+
+    sent: dict[int, Message] = {}
+    if receivers:
+        # One multi-row INSERT ... RETURNING for the messages, one upsert for the notifications
+        result = await db.execute(
+            insert(Message).returning(Message, sort_by_parameter_order=True),
+            [
+                {"sender_id": current_user.id, "receiver_id": user_id, "content": message.content}
+                for user_id in receivers
+            ],
+        )
+        sent = {msg.receiver_id: msg for msg in result.scalars().all()}
+
+        notifications = await notify_new_messages(db, sent.values())
+        await record_messages(db, sent.values())
+        await add_unread(
+            db,
+            messages={user_id: 1 for user_id in sent},
+            notifications={n.user_id: 1 for n in notifications if n.count == 1},
+        )
+        await db.commit()
+        _push_new_messages(MessageOut.model_validate(msg) for msg in sent.values())
+        _push_notifications(notifications, current_user)
+
+    results = []
+    for user_id in recipient_ids:
+        if user_id in sent:
+            results.append(RecipientResult(
+                to_user_id=user_id,
+                status="sent",
+                message=MessageOut.model_validate(sent[user_id]),
+            ))
+        else:
+            results.append(RecipientResult(to_user_id=user_id, status="not_found"))
+    return MulticastOut(results=results, sent=len(sent))
+
+
+def _before_cursor(cursor: str, message=Message):
+    """Match messages that sort after the cursor, newest first."""
+    created_at, message_id = decode_cursor(cursor)
+    return tuple_(message.created_at, message.id) < tuple_(created_at, message_id)
+
+
+def _paginate(stmt, limit: int, cursor: Optional[str], message=Message):
+    """Apply keyset pagination on (created_at, id), newest first."""
+    if cursor:
+        stmt = stmt.where(_before_cursor(cursor, message))
+    # Fetch one extra row to learn whether another page exists
+    return stmt.order_by(message.created_at.desc(), message.id.desc()).limit(limit + 1)
+
+
+def _with_read_state(stmt, message=Message):
+    """Join each message to its receiver's read watermark for the sender."""
+    return stmt.add_columns(
+        ConversationReadState.last_read_message_id, ConversationReadState.read_at
+    ).outerjoin(ConversationReadState, _read_state_join(message))
+
+
+async def _unread_ranges(
+    db: AsyncSession, reader_id: int, sender_id: Optional[int] = None
+) -> list[tuple[int, int]]:
+    """Return (peer_id, watermark) for each of the reader's conversations with unread messages."""
+    stmt = (
+        select(
+            Conversation.peer_id,
+            func.coalesce(ConversationReadState.last_read_message_id, 0),
+        )
+        .outerjoin(
+            ConversationReadState,
+            and_(
+                ConversationReadState.reader_id == Conversation.owner_id,
+                ConversationReadState.peer_id == Conversation.peer_id,
+            ),
+        )
+        .where(Conversation.owner_id == reader_id, Conversation.unread_count > 0)
     )
-    db.add(notification)
-    await db.commit()
+    if sender_id is not None:
+        stmt = stmt.where(Conversation.peer_id == sender_id)
+    result = await db.execute(stmt)
+    return [tuple(row) for row in result.all()]
+
 
-    return MessageOut.model_validate(new_message)
+def _unread_messages(
+    receiver_id: int, ranges: list[tuple[int, int]], cursor: Optional[str]
+):
+    """
+    Subquery of the receiver's messages above each peer's watermark.
+
+    Each (sender_id, id > watermark) range is read on
+    ix_messages_receiver_sender_id. OFFSET 0 keeps Postgres from serving the
+    outer ORDER BY ... LIMIT by walking ix_messages_receiver_created instead,
+    which reads the whole history when the unread messages are old.
+    """
+    stmt = select(Message).where(
+        Message.receiver_id == receiver_id,
+        or_(*(
+            and_(Message.sender_id == peer_id, Message.id > watermark)
+            for peer_id, watermark in ranges
+        )),
+    )
+    if cursor:
+        stmt = stmt.where(_before_cursor(cursor))
+    return stmt.offset(0).subquery()
+
+
+def _message_out(
+    message: Message, last_read_message_id: Optional[int], read_at: Optional[datetime]
+) -> MessageOut:
+    """Build the response for a message, deriving is_read from the watermark."""
+    is_read = last_read_message_id is not None and message.id <= last_read_message_id
+    return MessageOut(
+        id=message.id,
+        sender_id=message.sender_id,
+        receiver_id=message.receiver_id,
+        content=message.content,
+        is_read=is_read,
+        read_at=read_at if is_read else None,
+        created_at=message.created_at,
+    )
+
+
+async def _load_new_message_event(db: AsyncSession, message_id: int) -> Optional[dict]:
+    """Fetch a new_message event that was broadcast by id only."""
+    result = await db.execute(
+        _with_read_state(select(Message)).where(Message.id == message_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    return NewMessageEvent(message=_message_out(*row)).model_dump(mode="json")
+
+
+async def _load_notification_event(db: AsyncSession, notification_id: int) -> Optional[dict]:
+    """Fetch a notification event that was broadcast by id only."""
+    result = await db.execute(
+        select_notifications().where(Notification.id == notification_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    return NotificationEvent(notification=render_notification(*row)).model_dump(
+        mode="json"
+    )
+
+
+register_loader("new_message", _load_new_message_event)
+register_loader("notification", _load_notification_event)
+
+
+def _page(rows: list, limit: int) -> tuple[list[MessageOut], Optional[str]]:
+    """Trim the extra row and build the cursor for the next page."""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return [_message_out(*row) for row in rows], next_cursor
 
 
 @router.get("/inbox")
 async def get_inbox(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    unread_only: bool = False,
+    sender_id: Optional[int] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    """Get received messages (inbox)."""
-    result = await db.execute(
-        select(Message)
-        .where(Message.receiver_id == current_user.id)
-        .order_by(Message.created_at.desc())
-    )
-    messages = result.scalars().all()
+    """Get received messages (inbox), newest first, one page at a time."""
+    if unread_only:
+        # Only the conversations with unread messages are read, never the history
+        ranges = await _unread_ranges(db, current_user.id, sender_id)
+        if not ranges:
+            return InboxOut(messages=[], total=0)
+        message = aliased(Message, _unread_messages(current_user.id, ranges, cursor))
+        stmt = _with_read_state(select(message), message)
+    else:
+        message = Message
+        stmt = _with_read_state(select(Message)).where(Message.receiver_id == current_user.id)
+        if sender_id is not None:
+            stmt = stmt.where(Message.sender_id == sender_id)
 
-    return InboxOut(
-        messages=[MessageOut.model_validate(msg) for msg in messages],
-        total=len(messages)
-    )
+    result = await db.execute(_paginate(stmt, limit, cursor, message))
+    messages, next_cursor = _page(result.all(), limit)
+
+    return InboxOut(messages=messages, total=len(messages), next_cursor=next_cursor)
 
 
 @router.get("/outbox")
 async def get_outbox(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    receiver_id: Optional[int] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    """Get sent messages (outbox)."""
-    result = await db.execute(
-        select(Message)
-        .where(Message.sender_id == current_user.id)
-        .order_by(Message.created_at.desc())
+    """Get sent messages (outbox), newest first, one page at a time."""
+    stmt = _with_read_state(select(Message)).where(Message.sender_id == current_user.id)
+    if receiver_id is not None:
+        stmt = stmt.where(Message.receiver_id == receiver_id)
+
+    result = await db.execute(_paginate(stmt, limit, cursor))
+    messages, next_cursor = _page(result.all(), limit)
+
+    return OutboxOut(messages=messages, total=len(messages), next_cursor=next_cursor)
+
+
+@router.get("/conversation/{peer_id}")
+async def get_conversation(
+    peer_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Get messages exchanged with one user, newest first, one page at a time."""
+    # Match the unordered pair: one range scan on ix_messages_pair_created, both directions
+    low, high = sorted((current_user.id, peer_id))
+    stmt = _with_read_state(select(Message)).where(
+        func.least(Message.sender_id, Message.receiver_id) == low,
+        func.greatest(Message.sender_id, Message.receiver_id) == high,
+    )
+
+    result = await db.execute(_paginate(stmt, limit, cursor))
+    messages, next_cursor = _page(result.all(), limit)
+
+    return ConversationOut(
+        peer_id=peer_id, messages=messages, total=len(messages), next_cursor=next_cursor
     )
-    messages = result.scalars().all()
 
-    return OutboxOut(
-        messages=[MessageOut.model_validate(msg) for msg in messages],
-        total=len(messages)
+
+async def _advance_watermarks(
+    db: AsyncSession, reader_id: int, targets: dict[int, int], read_at: datetime
+) -> set[int]:
+    """Upsert the reader's watermark per peer; return the peers whose watermark moved."""
+    stmt = pg_insert(ConversationReadState).values([
+        {
+            "reader_id": reader_id,
+            "peer_id": peer_id,
+            "last_read_message_id": message_id,
+            "read_at": read_at,
+        }
+        for peer_id, message_id in targets.items()
+    ])
+    # Watermarks only move forward; a stale or repeated mark matches no row
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ConversationReadState.reader_id, ConversationReadState.peer_id],
+        set_={
+            "last_read_message_id": stmt.excluded.last_read_message_id,
+            "read_at": stmt.excluded.read_at,
+        },
+        where=ConversationReadState.last_read_message_id < stmt.excluded.last_read_message_id,
+    ).returning(ConversationReadState.peer_id)
+    result = await db.execute(stmt)
+    return set(result.scalars().all())
+
+
+@router.post("/read", response_model=BatchReadReceipt)
+async def mark_messages_as_read(
+    request: BatchReadRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Mark a batch of received messages as read and notify each sender once.
+
+    Each sender's watermark moves to the newest selected message, which also
+    marks any older messages from that sender as read.
+    """
+    stmt = (
+        select(Message.id, Message.sender_id)
+        .outerjoin(ConversationReadState, _read_state_join())
+        .where(Message.receiver_id == current_user.id, _unread)
+    )
+    if request.message_ids is not None:
+        stmt = stmt.where(Message.id.in_(request.message_ids))
+    else:
+        stmt = stmt.where(
+            Message.sender_id == request.sender_id, Message.id <= request.up_to_id
+        )
+
+    # Ids that are missing, not ours or already read are simply not returned
+    result = await db.execute(stmt)
+    by_sender: dict[int, list[int]] = {}
+    for message_id, sender_id in result.all():
+        by_sender.setdefault(sender_id, []).append(message_id)
+
+    if not by_sender:
+        return BatchReadReceipt(message_ids=[])
+
+    read_at = datetime.utcnow()
+    # Counter rows first, in id order, so crossing reads queue instead of deadlocking
+    await lock_counters(db, [current_user.id, *by_sender])
+    targets = {sender_id: max(ids) for sender_id, ids in by_sender.items()}
+    advanced = await _advance_watermarks(db, current_user.id, targets, read_at)
+    # A concurrent request may have moved a watermark first; it owns that receipt
+    by_sender = {sender_id: ids for sender_id, ids in by_sender.items() if sender_id in advanced}
+
+    if by_sender:
+        # One aggregated read receipt per sender instead of one per message
+        seqs = await next_notification_seqs(db, by_sender)
+        result = await db.execute(
+            insert(Notification).returning(Notification),
+            [
+                {
+                    "user_id": sender_id,
+                    "type_code": MESSAGE_READ,
+                    "actor_id": current_user.id,
+                    "related_id": max(ids),
+                    "count": len(ids),
+                    "seq": seqs[sender_id],
+                }
+                for sender_id, ids in by_sender.items()
+            ],
+        )
+        notifications = result.scalars().all()
+        await refresh_unread_counts(db, current_user.id, by_sender)
+        await sync_unread_messages(db, current_user.id)
+        await add_unread(db, notifications={sender_id: 1 for sender_id in by_sender})
+    await db.commit()
+
+    if not by_sender:
+        return BatchReadReceipt(message_ids=[])
+    for sender_id, ids in by_sender.items():
+        _push_read_receipt(sender_id, current_user.id, ids, read_at)
+    _push_notifications(notifications, current_user)
+    return BatchReadReceipt(
+        message_ids=sorted(message_id for ids in by_sender.values() for message_id in ids),
+        read_at=read_at,
     )
 
 
@@ -100,42 +496,58 @@ async def get_outbox(
 async def mark_message_as_read(
     message_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    """Mark a message as read and notify the sender."""
+    """Mark a message as read and notify the sender on the first read only."""
     result = await db.execute(
-        select(Message).where(Message.id == message_id)
+        _with_read_state(select(Message.sender_id, Message.receiver_id))
+        .where(Message.id == message_id)
     )
-    message = result.scalar_one_or_none()
+    existing = result.one_or_none()
 
-    if not message:
+    if existing is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Message not found"
         )
 
-    # Check if user is the receiver
-    if message.receiver_id != current_user.id:
+    if existing.receiver_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only mark your own messages as read"
         )
 
-    # Mark as read
-    message.is_read = True
-    message.read_at = datetime.utcnow()
-    await db.commit()
-    await db.refresh(message)
+    # Already under the watermark: no write, no second notification
+    watermark = existing.last_read_message_id
+    if watermark is not None and message_id <= watermark:
+        return ReadReceipt(message_id=message_id, read_at=existing.read_at)
 
-    # Create notification for the sender (read receipt alert)
-    notification = Notification(
-        user_id=message.sender_id,
-        notification_type="message_read",
-        title="Message Read",
-        message=f"{current_user.username} read your message",
-        related_id=message.id
+    read_at = datetime.utcnow()
+    await lock_counters(db, [current_user.id, existing.sender_id])
+    advanced = await _advance_watermarks(
+        db, current_user.id, {existing.sender_id: message_id}, read_at
     )
-    db.add(notification)
+
+    if advanced:
+        # Create notification for the sender (read receipt alert) in the same transaction
+        seqs = await next_notification_seqs(db, [existing.sender_id])
+        result = await db.execute(
+            insert(Notification).values(
+                user_id=existing.sender_id,
+                type_code=MESSAGE_READ,
+                actor_id=current_user.id,
+                related_id=message_id,
+                seq=seqs[existing.sender_id],
+            ).returning(Notification)
+        )
+        notifications = result.scalars().all()
+        await refresh_unread_counts(db, current_user.id, advanced)
+        await sync_unread_messages(db, current_user.id)
+        await add_unread(db, notifications={existing.sender_id: 1})
     await db.commit()
 
-    return ReadReceipt(message_id=message.id, read_at=message.read_at)
+    if advanced:
+        _push_read_receipt(existing.sender_id, current_user.id, [message_id], read_at)
+        _push_notifications(notifications, current_user)
+
+    return ReadReceipt(message_id=message_id, read_at=read_at)
@@ -2,85 +2,327 @@
 Notification API endpoints.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import json
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, false, true, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.core.security import get_current_user
+from app.core.config import settings
+from app.core.counters import lock_counters, release_unread_notifications, remove_notifications
+from app.core.notifications import (
+    TYPE_CODES,
+    render_notification,
+    select_notifications,
+)
+from app.core.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_id_cursor,
+    encode_id_cursor,
+)
+from app.core.push import Subscription, hub
+from app.core.security import get_current_principal
 from app.db.database import get_db
-from app.models import Notification, User
-from app.schemas.notification import NotificationOut, NotificationsList
+from app.models import Notification
+from app.schemas.notification import (
+    NotificationBatchRead,
+    NotificationOut,
+    NotificationsList,
+    NotificationsUpdated,
+)
+from app.schemas.user import Principal
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
 
 @router.get("", response_model=NotificationsList)
 async def get_notifications(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    is_read: Optional[bool] = None,
+    notification_type: Optional[str] = Query(None, max_length=50),
+    since_seq: Optional[int] = Query(None, ge=0),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Get the current user's notifications, newest first, one page at a time.
+
+    Filter on is_read and notification_type; since_seq keeps only
+    notifications newer than that seq.
+    """
+    stmt = select_notifications().where(Notification.user_id == current_user.id)
+    if is_read is not None:
+        # A literal (not a bound parameter) so unread pages match the partial index
+        stmt = stmt.where(Notification.is_read == (true() if is_read else false()))
+    if notification_type is not None:
+        # An unknown type matches nothing
+        stmt = stmt.where(Notification.type_code == TYPE_CODES.get(notification_type))
+    if since_seq is not None:
+        stmt = stmt.where(Notification.seq > since_seq)
+    if cursor:
+        stmt = stmt.where(Notification.seq < decode_id_cursor(cursor))
+    # Newest seq first; fetch one extra row to learn whether another page exists
+    stmt = stmt.order_by(Notification.seq.desc()).limit(limit + 1)
+
+    rows = (await db.execute(stmt)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_id_cursor(rows[-1][0].seq)
+
+    return NotificationsList(
+        notifications=[render_notification(*row) for row in rows],
+        total=len(rows),
+        next_cursor=next_cursor,
+    )
+
+
+async def _notifications_after(
+    db: AsyncSession, user_id: int, after_seq: int, limit: Optional[int] = None
+) -> list[NotificationOut]:
+    """Return a user's notifications with seqs above after_seq, oldest first."""
+    stmt = (
+        select_notifications()
+        .where(Notification.user_id == user_id, Notification.seq > after_seq)
+        .order_by(Notification.seq)
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return [render_notification(*row) for row in result.all()]
+
+
+def _sse_event(notification: dict) -> str:
+    """Format a notification as an SSE event whose id is the notification seq."""
+    return (
+        f"id: {notification['seq']}\n"
+        "event: notification\n"
+        f"data: {json.dumps(notification)}\n\n"
+    )
+
+
+async def _notification_events(
+    subscription: Subscription,
+    missed: list[NotificationOut],
+    heartbeat: float,
+) -> AsyncIterator[str]:
+    """Yield missed notifications, then live ones, with idle heartbeats."""
+    try:
+        last_seq = 0
+        for notification in missed:
+            last_seq = notification.seq
+            yield _sse_event(notification.model_dump(mode="json"))
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), heartbeat)
+            except asyncio.TimeoutError:
+                # A comment line keeps proxies from closing the idle connection
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                # Closed by the hub; the client reconnects with Last-Event-ID
+                return
+            notification = event["notification"]
+            # Published while the missed rows were being read
+            if notification["seq"] <= last_seq:
+                continue
+            yield _sse_event(notification)
+    finally:
+        hub.unsubscribe(subscription)
+
+
+@router.get("/stream")
+async def stream_notifications(
+    last_event_id: Optional[int] = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Stream new notifications as Server-Sent Events.
+
+    Event ids are notification seqs, so a notification that coalesces more
+    events is sent again. A reconnecting client that sends Last-Event-ID
+    first receives only the notifications it missed.
+    """
+    # Subscribe before reading missed rows so nothing falls in between
+    subscription = hub.subscribe(current_user.id, event_types=("notification",))
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is shutting down",
+        )
+
+    missed: list[NotificationOut] = []
+    if last_event_id is not None:
+        try:
+            missed = await _notifications_after(db, current_user.id, last_event_id)
+        except BaseException:
+            hub.unsubscribe(subscription)
+            raise
+
+    # The session is released when this handler returns, before streaming starts
+    return StreamingResponse(
+        _notification_events(subscription, missed, settings.SSE_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/read-all", response_model=NotificationsUpdated)
+async def mark_all_notifications_as_read(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    """Get all notifications for the current user."""
+    """Mark every unread notification of the current user as read."""
+    # Counter row before notification rows, the order a concurrent send takes them
+    await lock_counters(db, [current_user.id])
     result = await db.execute(
-        select(Notification)
-        .where(Notification.user_id == current_user.id)
-        .order_by(Notification.created_at.desc())
+        update(Notification)
+        .where(Notification.user_id == current_user.id, Notification.is_read == false())
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
     )
-    notifications = result.scalars().all()
+    # Subtract rather than zero: a notification may have arrived meanwhile
+    if result.rowcount:
+        await release_unread_notifications(db, current_user.id, result.rowcount)
+    await db.commit()
 
-    return NotificationsList(
-        notifications=[NotificationOut.model_validate(notif) for notif in notifications],
-        total=len(notifications)
+    return NotificationsUpdated(updated=result.rowcount)
+
+
+@router.post("/read", response_model=NotificationsUpdated)
+async def mark_notifications_as_read(
+    request: NotificationBatchRead,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Mark the given notifications as read; unknown or foreign ids are ignored."""
+    await lock_counters(db, [current_user.id])
+    result = await db.execute(
+        update(Notification)
+        .where(
+            Notification.id.in_(request.notification_ids),
+            Notification.user_id == current_user.id,
+            Notification.is_read == false(),
+        )
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
     )
+    if result.rowcount:
+        await release_unread_notifications(db, current_user.id, result.rowcount)
+    await db.commit()
+
+    return NotificationsUpdated(updated=result.rowcount)
+
+
+@router.get("/wait", response_model=NotificationsList)
+async def wait_for_notifications(
+    after_seq: int = Query(..., ge=0),
+    timeout: float = Query(30, gt=0, le=settings.LONG_POLL_MAX_SECONDS),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Long-poll for notifications with seqs above after_seq.
+
+    Returns as soon as there are any (oldest first, at most a page), or an
+    empty list once timeout seconds pass. No database connection is held
+    while waiting.
+    """
+    # Subscribe before checking so a notification created in between wakes us
+    subscription = hub.subscribe(current_user.id, event_types=("notification",))
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is shutting down",
+        )
+
+    try:
+        notifications = await _notifications_after(
+            db, current_user.id, after_seq, MAX_PAGE_SIZE
+        )
+        if not notifications:
+            # Return the connection to the pool while parked
+            await db.close()
+            try:
+                await asyncio.wait_for(subscription.get(), timeout)
+            except asyncio.TimeoutError:
+                return NotificationsList(notifications=[], total=0)
+            notifications = await _notifications_after(
+                db, current_user.id, after_seq, MAX_PAGE_SIZE
+            )
+    finally:
+        hub.unsubscribe(subscription)
+
+    return NotificationsList(notifications=notifications, total=len(notifications))
 
 
 @router.get("/{notification_id}", response_model=NotificationOut)
 async def get_notification(
     notification_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get a specific notification."""
     result = await db.execute(
-        select(Notification).where(
+        select_notifications().where(
             Notification.id == notification_id,
             Notification.user_id == current_user.id
         )
     )
-    notification = result.scalar_one_or_none()
+    row = result.one_or_none()
 
-    if not notification:
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notification not found"
         )
 
-    return NotificationOut.model_validate(notification)
+    return render_notification(*row)
 
 
 @router.post("/{notification_id}/read")
 async def mark_notification_as_read(
     notification_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Mark a notification as read."""
+    # Only the unread -> read transition writes and moves the counter
+    await lock_counters(db, [current_user.id])
     result = await db.execute(
-        select(Notification).where(
+        update(Notification)
+        .where(
             Notification.id == notification_id,
-            Notification.user_id == current_user.id
+            Notification.user_id == current_user.id,
+            Notification.is_read == false(),
         )
+        .values(is_read=True)
+        .returning(Notification.id)
+        .execution_options(synchronize_session=False)
     )
-    notification = result.scalar_one_or_none()
 
-    if not notification:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Notification not found"
+    if result.scalar_one_or_none() is not None:
+        await release_unread_notifications(db, current_user.id, 1)
+        await db.commit()
+    else:
+        result = await db.execute(
+            select(Notification.id).where(
+                Notification.id == notification_id,
+                Notification.user_id == current_user.id
+            )
         )
-
-    notification.is_read = True
-    await db.commit()
-    await db.refresh(notification)
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Notification not found"
+            )
 
     return {"message": "Notification marked as read", "notification_id": notification_id}
 
@@ -88,16 +330,22 @@ async def mark_notification_as_read(
 @router.delete("")
 async def delete_all_notifications(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Delete all notifications for the current user."""
+    await lock_counters(db, [current_user.id])
+    # One set-based DELETE; rows are never loaded into the session
     result = await db.execute(
-        select(Notification).where(Notification.user_id == current_user.id)
+        delete(Notification)
+        .where(Notification.user_id == current_user.id)
+        .returning(Notification.is_read)
+        .execution_options(synchronize_session=False)
     )
-    notifications = result.scalars().all()
-
-    for notification in notifications:
-        await db.delete(notification)
+    deleted = result.scalars().all()
+    # Subtract rather than zero: a notification may have arrived meanwhile
+    if deleted:
+        unread = sum(1 for is_read in deleted if not is_read)
+        await remove_notifications(db, current_user.id, len(deleted), unread)
     await db.commit()
 
-    return {"message": "All notifications deleted"}
+    return {"message": "All notifications deleted", "deleted": len(deleted)}
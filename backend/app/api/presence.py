@@ -0,0 +1,28 @@
+"""
+Presence API endpoints.
+"""
+
+from fastapi import APIRouter, Depends, Query
+
+from app.core.presence import presence
+from app.core.security import get_current_principal
+from app.schemas.presence import HeartbeatOut, PresenceOut
+from app.schemas.user import Principal
+
+router = APIRouter(prefix="/presence", tags=["presence"])
+
+
+@router.post("/heartbeat", response_model=HeartbeatOut)
+async def heartbeat(current_user: Principal = Depends(get_current_principal)):
+    """Keep the current user online; clients should call this within the TTL."""
+    # get_current_principal already recorded the heartbeat
+    return HeartbeatOut(user_id=current_user.id, ttl_seconds=presence.ttl)
+
+
+@router.get("", response_model=PresenceOut)
+async def get_online_users(
+    user_ids: list[int] = Query(..., max_length=500),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Return which of the given users are online, without touching the database."""
+    return PresenceOut(online=presence.online(user_ids))
@@ -0,0 +1,81 @@
+"""
+WebSocket push endpoint.
+"""
+
+import asyncio
+import logging
+from contextlib import suppress
+
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.presence import presence
+from app.core.push import CLOSE_SHUTDOWN, Subscription, hub
+from app.core.security import get_token_claims, principal_from_claims
+from app.db.database import get_db
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["push"])
+
+
+async def _send_events(websocket: WebSocket, subscription: Subscription) -> None:
+    """Forward queued events until the hub closes the connection."""
+    while True:
+        event = await subscription.get()
+        if event is None:
+            await websocket.close(code=subscription.close_code)
+            return
+        await websocket.send_json(event)
+
+
+async def _receive(websocket: WebSocket, user_id: int) -> None:
+    """Treat client frames as presence heartbeats until the client disconnects."""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+        presence.heartbeat(user_id)
+
+
+@router.websocket("/ws")
+async def push_socket(websocket: WebSocket, db: AsyncSession = Depends(get_db)):
+    """Push new messages and read receipts to the authenticated user."""
+    try:
+        payload = get_token_claims(websocket.cookies.get("access_token"))
+        principal = await principal_from_claims(payload, db)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    finally:
+        # Only needed for the handshake; don't pin a pooled connection
+        await db.close()
+
+    subscription = hub.subscribe(
+        principal.id, event_types=("new_message", "message_read")
+    )
+    if subscription is None:
+        await websocket.close(code=CLOSE_SHUTDOWN)
+        return
+
+    try:
+        await websocket.accept()
+        presence.heartbeat(principal.id)
+        tasks = {
+            asyncio.create_task(_send_events(websocket, subscription)),
+            asyncio.create_task(_receive(websocket, principal.id)),
+        }
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        for task in done:
+            if task.exception() is not None:
+                logger.debug(
+                    "Push connection for user %s ended: %r",
+                    principal.id,
+                    task.exception(),
+                )
+    finally:
+        hub.unsubscribe(subscription)
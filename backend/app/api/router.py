@@ -5,18 +5,26 @@ API Router - Main entry point for all API endpoints.
 from fastapi import APIRouter
 
 from app.api import auth
+from app.api import conversations
+from app.api import counts
 from app.api import friends
 from app.api import messages
 from app.api import notifications
+from app.api import presence
+from app.api import push
 from app.api import users
 
 router = APIRouter()
 
 # Include all API routers (without extra prefix - it's added in main.py)
 router.include_router(auth.router)
+router.include_router(conversations.router)
+router.include_router(counts.router)
 router.include_router(friends.router)
 router.include_router(messages.router)
 router.include_router(notifications.router)
+router.include_router(presence.router)
+router.include_router(push.router)
 router.include_router(users.router)
 
 
@@ -6,6 +6,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.core.presence import presence
+from app.core.security import invalidate_cached_user
 from app.schemas.user import UserOut, UserStatusUpdate
 from app.db.database import get_db
 from app.models import User
@@ -29,6 +31,11 @@ async def update_user_status(
 
     user.is_active = status_update.is_active
     await db.commit()
-    await db.refresh(user)
+    invalidate_cached_user(user.username)
+
+    if user.is_active:
+        presence.mark_online(user.id, persisted=True)
+    else:
+        presence.mark_offline(user.id, persisted=True)
 
     return user
@@ -0,0 +1,180 @@
+"""
+Notification history compaction.
+
+Each user keeps at most their newest NOTIFICATION_HISTORY_MAX_PER_USER
+notifications, none older than NOTIFICATION_HISTORY_MAX_AGE_DAYS. A
+background task deletes the overflow in bounded batches, committing after
+each one so no transaction holds its locks for long. Removed notifications
+are taken off the users' counters in the same transaction.
+
+Users over the cap are found from user_counters.total_notifications, one
+row per user, so a run never scans the whole notifications table.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.counters import lock_counters, remove_notifications
+from app.models import Notification, UserCounters
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationCompactor:
+    """Delete notifications beyond the per-user cap or age limit, in batches."""
+
+    def __init__(
+        self,
+        max_per_user: int,
+        max_age_days: float,
+        batch_size: int,
+        clock: Callable[[], float] = time.monotonic,
+        now: Callable[[], datetime] = datetime.utcnow,
+    ):
+        self.max_per_user = max_per_user
+        self.max_age_days = max_age_days
+        self.batch_size = batch_size
+        self._clock = clock
+        self._now = now
+        self.last_run: Optional[dict] = None
+
+    async def run(self, db: AsyncSession) -> dict:
+        """Compact until nothing is over the limits; returns what was removed."""
+        started = self._clock()
+        removed_by_age = await self._remove_expired(db) if self.max_age_days > 0 else 0
+        removed_by_cap = await self._remove_overflow(db) if self.max_per_user > 0 else 0
+        self.last_run = {
+            "removed_by_age": removed_by_age,
+            "removed_by_cap": removed_by_cap,
+            "seconds": round(self._clock() - started, 3),
+            "finished_at": self._now().isoformat(),
+        }
+        logger.info(
+            "Notification compaction removed %d expired and %d overflow rows in %.3fs",
+            removed_by_age,
+            removed_by_cap,
+            self.last_run["seconds"],
+        )
+        return self.last_run
+
+    def stats(self) -> Optional[dict]:
+        """Return the report of the last completed run."""
+        return self.last_run
+
+    async def _delete(self, db: AsyncSession, stmt, user_ids: Iterable[int]) -> int:
+        """Run one batch DELETE of user_ids' notifications, fix their counters and commit."""
+        # Counter rows before notification rows, the order sends and reads take them
+        await lock_counters(db, user_ids)
+        result = await db.execute(
+            stmt.returning(Notification.user_id, Notification.is_read)
+        )
+        rows = result.all()
+        removed = Counter(user_id for user_id, _ in rows)
+        unread = Counter(user_id for user_id, is_read in rows if not is_read)
+        for user_id, count in removed.items():
+            await remove_notifications(db, user_id, count, unread[user_id])
+        await db.commit()
+        return len(rows)
+
+    async def _remove_expired(self, db: AsyncSession) -> int:
+        """
+        Delete notifications older than the age limit, in id order.
+
+        Each batch selects expired rows directly and resumes after the last
+        id it saw. Coalesced notifications keep their low id but take a new
+        created_at, so expired rows are not confined to a prefix of the ids.
+        """
+        cutoff = self._now() - timedelta(days=self.max_age_days)
+        removed = 0
+        after_id = 0
+        while True:
+            result = await db.execute(
+                select(Notification.id, Notification.user_id)
+                .where(Notification.id > after_id, Notification.created_at < cutoff)
+                .order_by(Notification.id)
+                .limit(self.batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                await db.commit()
+                return removed
+            removed += await self._delete(
+                db,
+                delete(Notification).where(
+                    Notification.id.in_([row_id for row_id, _ in rows]),
+                    Notification.created_at < cutoff,
+                ),
+                {user_id for _, user_id in rows},
+            )
+            if len(rows) < self.batch_size:
+                return removed
+            after_id = rows[-1][0]
+            await asyncio.sleep(0)
+
+    async def _remove_overflow(self, db: AsyncSession) -> int:
+        """Delete each user's notifications beyond their newest max_per_user."""
+        result = await db.execute(
+            select(UserCounters.user_id).where(
+                UserCounters.total_notifications > self.max_per_user
+            )
+        )
+        user_ids = result.scalars().all()
+
+        removed = 0
+        for user_id in user_ids:
+            # Newest seq that falls outside the cap (one short index scan)
+            result = await db.execute(
+                select(Notification.seq)
+                .where(Notification.user_id == user_id)
+                .order_by(Notification.seq.desc())
+                .offset(self.max_per_user)
+                .limit(1)
+            )
+            boundary = result.scalar_one_or_none()
+            while boundary is not None:
+                batch = (
+                    select(Notification.id)
+                    .where(Notification.user_id == user_id, Notification.seq <= boundary)
+                    .order_by(Notification.seq)
+                    .limit(self.batch_size)
+                    .scalar_subquery()
+                )
+                deleted = await self._delete(
+                    db, delete(Notification).where(Notification.id.in_(batch)), [user_id]
+                )
+                removed += deleted
+                if deleted < self.batch_size:
+                    break
+                await asyncio.sleep(0)
+        await db.commit()
+        return removed
+
+
+async def run_compaction_loop(
+    compactor: NotificationCompactor,
+    session_factory: Callable[[], AsyncSession],
+    interval: float,
+) -> None:
+    """Compact every interval seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_factory() as db:
+                await compactor.run(db)
+        except Exception:
+            logger.exception("Failed to compact notifications")
+
+
+compactor = NotificationCompactor(
+    max_per_user=settings.NOTIFICATION_HISTORY_MAX_PER_USER,
+    max_age_days=settings.NOTIFICATION_HISTORY_MAX_AGE_DAYS,
+    batch_size=settings.NOTIFICATION_COMPACTION_BATCH_SIZE,
+)
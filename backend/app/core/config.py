@@ -5,7 +5,7 @@ Application configuration using Pydantic settings.
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import PostgresDsn
 from functools import lru_cache
-from typing import Optional
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -40,6 +40,44 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
 
+    # Password hashing (bcrypt runs on a bounded worker pool)
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 32  # Requests waiting beyond this get a 503
+
+    # Authenticated user cache (0 disables it)
+    USER_CACHE_SIZE: int = 10_000
+    USER_CACHE_TTL_SECONDS: float = 60.0
+
+    # Decoded JWT claims cache (0 disables it); entries expire with the token
+    TOKEN_CACHE_SIZE: int = 10_000
+
+    # Presence (heartbeats are kept in memory and flushed to users.is_active)
+    PRESENCE_TTL_SECONDS: float = 90.0
+    PRESENCE_FLUSH_INTERVAL_SECONDS: float = 15.0
+
+    # WebSocket push (per-connection send queue; slower clients are disconnected)
+    PUSH_QUEUE_SIZE: int = 100
+    PUSH_SHUTDOWN_TIMEOUT_SECONDS: float = 5.0
+    # Idle SSE connections get a comment line this often to stay open
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+    # Longest a GET /notifications/wait request may be held open
+    LONG_POLL_MAX_SECONDS: float = 60.0
+
+    # Notification history kept per user (0 disables a limit); a background
+    # task deletes the overflow in batches every interval
+    NOTIFICATION_HISTORY_MAX_PER_USER: int = 1000
+    NOTIFICATION_HISTORY_MAX_AGE_DAYS: float = 90.0
+    NOTIFICATION_COMPACTION_INTERVAL_SECONDS: float = 300.0
+    NOTIFICATION_COMPACTION_BATCH_SIZE: int = 500
+
+    # Event bus fanning push events and cache invalidations out to every worker:
+    # "memory" (single process) or "postgres" (LISTEN/NOTIFY)
+    EVENT_BUS_BACKEND: Literal["memory", "postgres"] = "memory"
+    EVENT_BUS_CHANNEL: str = "awkward_turtle_events"
+    EVENT_BUS_BATCH_DELAY_SECONDS: float = 0.005
+    # Larger events are broadcast as an id that receivers fetch on demand
+    EVENT_BUS_INLINE_LIMIT_BYTES: int = 4000
+
     # CORS
     CORS_ORIGINS: list[str] = ["http://localhost:3010", "http://localhost:3000"]
 
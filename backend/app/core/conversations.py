@@ -0,0 +1,104 @@
+"""
+Conversation summary maintenance.
+
+Each user has one row in conversations per peer, holding the last message
+and an unread count, so the conversation list never scans messages. Sends
+and reads update these rows in the same transaction as the message writes.
+"""
+
+from typing import Iterable
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Conversation, ConversationReadState, Message
+
+PREVIEW_LENGTH = 140
+
+_LAST_MESSAGE_COLUMNS = (
+    "last_message_id",
+    "last_sender_id",
+    "last_message_preview",
+    "last_message_at",
+)
+
+
+async def record_messages(db: AsyncSession, messages: Iterable[Message]) -> None:
+    """Upsert both participants' summaries for newly sent messages."""
+    rows: dict[tuple[int, int], dict] = {}
+    for msg in messages:
+        last = {
+            "last_message_id": msg.id,
+            "last_sender_id": msg.sender_id,
+            "last_message_preview": msg.content[:PREVIEW_LENGTH],
+            "last_message_at": msg.created_at,
+        }
+        # The receiver gains an unread message; a note to self lands on one row
+        rows[(msg.sender_id, msg.receiver_id)] = {
+            "owner_id": msg.sender_id,
+            "peer_id": msg.receiver_id,
+            "unread_count": int(msg.sender_id == msg.receiver_id),
+            **last,
+        }
+        if msg.sender_id != msg.receiver_id:
+            rows[(msg.receiver_id, msg.sender_id)] = {
+                "owner_id": msg.receiver_id,
+                "peer_id": msg.sender_id,
+                "unread_count": 1,
+                **last,
+            }
+    if not rows:
+        return
+
+    # Rows lock in key order, so crossing sends between two users cannot deadlock
+    stmt = insert(Conversation).values([rows[key] for key in sorted(rows)])
+    # Concurrent sends may commit out of id order; keep whichever message is newer
+    newer = stmt.excluded.last_message_id > Conversation.last_message_id
+    set_ = {
+        column: case((newer, stmt.excluded[column]), else_=Conversation.__table__.c[column])
+        for column in _LAST_MESSAGE_COLUMNS
+    }
+    set_["unread_count"] = Conversation.unread_count + stmt.excluded.unread_count
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[Conversation.owner_id, Conversation.peer_id], set_=set_
+        )
+    )
+
+
+async def refresh_unread_counts(
+    db: AsyncSession, reader_id: int, peer_ids: Iterable[int]
+) -> None:
+    """Recount unread messages above the reader's watermark for each peer."""
+    peer_ids = list(peer_ids)
+    if not peer_ids:
+        return
+
+    watermark = (
+        select(ConversationReadState.last_read_message_id)
+        .where(
+            ConversationReadState.reader_id == Conversation.owner_id,
+            ConversationReadState.peer_id == Conversation.peer_id,
+        )
+        # Nested two levels down, so auto-correlation would not reach the UPDATE
+        .correlate(Conversation)
+        .scalar_subquery()
+    )
+    # Served by ix_messages_receiver_sender_id: only the unread tail is counted
+    unread = (
+        select(func.count())
+        .select_from(Message)
+        .where(
+            Message.receiver_id == Conversation.owner_id,
+            Message.sender_id == Conversation.peer_id,
+            Message.id > func.coalesce(watermark, 0),
+        )
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(Conversation)
+        .where(Conversation.owner_id == reader_id, Conversation.peer_id.in_(peer_ids))
+        .values(unread_count=unread)
+        .execution_options(synchronize_session=False)
+    )
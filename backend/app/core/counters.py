@@ -0,0 +1,223 @@
+"""
+Per-user unread counters.
+
+The badge reads user_counters instead of counting messages and
+notifications. Writers adjust the counters in the same transaction as the
+rows they create or change; reconcile_counters recomputes them from the
+source tables to repair any drift. total_notifications counts every stored
+notification, so compaction can find users over the history cap without
+scanning the notifications table.
+
+A transaction that changes several users' counters takes all of their rows
+first, in user id order, with lock_counters or next_notification_seqs, and
+only then writes conversations or notifications. Two requests touching the
+same pair of users then queue on the lower id instead of deadlocking.
+"""
+
+from typing import Iterable, Mapping, Optional
+
+from sqlalchemy import and_, false, func, or_, select, true, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import (
+    Conversation,
+    ConversationReadState,
+    Message,
+    Notification,
+    User,
+    UserCounters,
+)
+
+
+async def add_unread(
+    db: AsyncSession,
+    messages: Optional[Mapping[int, int]] = None,
+    notifications: Optional[Mapping[int, int]] = None,
+) -> None:
+    """
+    Increment users' unread counters with one upsert, creating rows as needed.
+
+    notifications counts newly inserted notification rows, so it adds to
+    total_notifications as well.
+    """
+    messages = messages or {}
+    notifications = notifications or {}
+    user_ids = sorted(set(messages) | set(notifications))
+    if not user_ids:
+        return
+
+    stmt = insert(UserCounters).values([
+        {
+            "user_id": user_id,
+            "unread_messages": messages.get(user_id, 0),
+            "unread_notifications": notifications.get(user_id, 0),
+            "total_notifications": notifications.get(user_id, 0),
+        }
+        for user_id in user_ids
+    ])
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[UserCounters.user_id],
+            set_={
+                "unread_messages": UserCounters.unread_messages
+                + stmt.excluded.unread_messages,
+                "unread_notifications": UserCounters.unread_notifications
+                + stmt.excluded.unread_notifications,
+                "total_notifications": UserCounters.total_notifications
+                + stmt.excluded.total_notifications,
+            },
+        )
+    )
+
+
+async def lock_counters(db: AsyncSession, user_ids: Iterable[int]) -> None:
+    """Lock users' counter rows until commit, in user id order, creating them as needed."""
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+
+    stmt = insert(UserCounters).values([{"user_id": user_id} for user_id in user_ids])
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[UserCounters.user_id],
+            set_={"notification_seq": UserCounters.notification_seq},
+        )
+    )
+
+
+async def next_notification_seqs(db: AsyncSession, user_ids: Iterable[int]) -> dict[int, int]:
+    """
+    Hand each user the next sequence number for one notification.
+
+    The number comes from the user's counter row, which stays locked until
+    commit, so a user's notifications become visible in sequence order and a
+    stream resuming after one never skips an earlier one.
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return {}
+
+    stmt = insert(UserCounters).values(
+        [{"user_id": user_id, "notification_seq": 1} for user_id in user_ids]
+    )
+    result = await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[UserCounters.user_id],
+            set_={"notification_seq": UserCounters.notification_seq + 1},
+        ).returning(UserCounters.user_id, UserCounters.notification_seq)
+    )
+    return dict(result.all())
+
+
+async def release_unread_notifications(db: AsyncSession, user_id: int, count: int) -> None:
+    """Decrement a user's unread notification counter, never below zero."""
+    await db.execute(
+        update(UserCounters)
+        .where(UserCounters.user_id == user_id)
+        .values(
+            unread_notifications=func.greatest(UserCounters.unread_notifications - count, 0)
+        )
+    )
+
+
+async def remove_notifications(
+    db: AsyncSession, user_id: int, count: int, unread: int
+) -> None:
+    """Take count deleted notifications, unread of them unread, off a user's counters."""
+    await db.execute(
+        update(UserCounters)
+        .where(UserCounters.user_id == user_id)
+        .values(
+            unread_notifications=func.greatest(UserCounters.unread_notifications - unread, 0),
+            total_notifications=func.greatest(UserCounters.total_notifications - count, 0),
+        )
+    )
+
+
+async def sync_unread_messages(db: AsyncSession, user_id: int) -> None:
+    """Set a user's unread message counter from their conversation summaries."""
+    total = (
+        select(func.coalesce(func.sum(Conversation.unread_count), 0))
+        .where(Conversation.owner_id == user_id)
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(UserCounters)
+        .where(UserCounters.user_id == user_id)
+        .values(unread_messages=total)
+    )
+
+
+async def reconcile_counters(
+    db: AsyncSession, user_ids: Optional[Iterable[int]] = None
+) -> list[int]:
+    """
+    Recompute counters from messages and notifications.
+
+    Returns the ids of users whose stored counters had drifted (or were
+    missing). Pass user_ids to limit the repair to those users.
+    """
+    unread_messages = (
+        select(Message.receiver_id.label("user_id"), func.count().label("total"))
+        .outerjoin(
+            ConversationReadState,
+            and_(
+                ConversationReadState.reader_id == Message.receiver_id,
+                ConversationReadState.peer_id == Message.sender_id,
+            ),
+        )
+        .where(
+            or_(
+                ConversationReadState.last_read_message_id.is_(None),
+                Message.id > ConversationReadState.last_read_message_id,
+            )
+        )
+        .group_by(Message.receiver_id)
+        .subquery()
+    )
+    notifications = (
+        select(
+            Notification.user_id,
+            func.count().filter(Notification.is_read == false()).label("unread"),
+            func.count().label("total"),
+        )
+        .group_by(Notification.user_id)
+        .subquery()
+    )
+    source = (
+        select(
+            User.id,
+            func.coalesce(unread_messages.c.total, 0),
+            func.coalesce(notifications.c.unread, 0),
+            func.coalesce(notifications.c.total, 0),
+        )
+        .outerjoin(unread_messages, unread_messages.c.user_id == User.id)
+        .outerjoin(notifications, notifications.c.user_id == User.id)
+        # SQLite needs a WHERE here to tell ON CONFLICT apart from a join constraint
+        .where(User.id.in_(list(user_ids)) if user_ids is not None else true())
+    )
+
+    stmt = insert(UserCounters).from_select(
+        ["user_id", "unread_messages", "unread_notifications", "total_notifications"],
+        source,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserCounters.user_id],
+        set_={
+            "unread_messages": stmt.excluded.unread_messages,
+            "unread_notifications": stmt.excluded.unread_notifications,
+            "total_notifications": stmt.excluded.total_notifications,
+        },
+        # Only drifted rows are rewritten (and returned)
+        where=or_(
+            UserCounters.unread_messages != stmt.excluded.unread_messages,
+            UserCounters.unread_notifications != stmt.excluded.unread_notifications,
+            UserCounters.total_notifications != stmt.excluded.total_notifications,
+        ),
+    ).returning(UserCounters.user_id)
+
+    result = await db.execute(stmt)
+    repaired = sorted(result.scalars().all())
+    await db.commit()
+    return repaired
@@ -0,0 +1,252 @@
+"""
+Event bus for fan-out across worker processes.
+
+Publishers hand the bus a topic and a JSON-serialisable payload; every
+process that subscribed a handler to the topic receives it. The base
+EventBus only reaches the current process. The Postgres backend also
+broadcasts through LISTEN/NOTIFY on one dedicated asyncpg connection per
+process, packing the events published within a short window into as few
+NOTIFY payloads as possible.
+
+Payloads that are too large to broadcast inline are replaced by a compact
+form supplied by the publisher (typically just an id); receiving processes
+pass it to the topic's resolver to fetch the full payload on demand.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+import asyncpg
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Payload = dict[str, Any]
+Handler = Callable[[Payload], None]
+Resolver = Callable[[Payload], Awaitable[Optional[Payload]]]
+
+
+class EventBus:
+    """
+    Publish payloads to the handlers subscribed to a topic.
+
+    Handlers are called synchronously in the publishing process. On its own
+    the bus reaches only this process; backends override _forward to reach
+    other processes as well.
+    """
+
+    def __init__(self):
+        self._handlers: dict[str, Handler] = {}
+        self._resolvers: dict[str, Resolver] = {}
+
+    def subscribe(
+        self, topic: str, handler: Handler, resolve: Optional[Resolver] = None
+    ) -> None:
+        """Handle a topic; resolve turns a compact payload back into a full one."""
+        self._handlers[topic] = handler
+        if resolve is not None:
+            self._resolvers[topic] = resolve
+
+    def publish(
+        self, topic: str, payload: Payload, compact: Optional[Payload] = None
+    ) -> None:
+        """Deliver a payload here and to other processes (compact if too large)."""
+        self._dispatch(topic, payload)
+        self._forward(topic, payload, compact)
+
+    def _dispatch(self, topic: str, payload: Payload) -> None:
+        handler = self._handlers.get(topic)
+        if handler is None:
+            return
+        try:
+            handler(payload)
+        except Exception:
+            logger.exception("Event handler for %r failed", topic)
+
+    def _forward(self, topic: str, payload: Payload, compact: Optional[Payload]) -> None:
+        """Send an event to other processes; a single-process bus has none."""
+
+    async def start(self) -> None:
+        """Connect the backend, if it needs to."""
+
+    async def stop(self) -> None:
+        """Deliver anything pending and disconnect."""
+
+
+class PostgresEventBus(EventBus):
+    """
+    Broadcast events to every process through Postgres LISTEN/NOTIFY.
+
+    Events are delivered locally at once and queued for broadcast; a
+    flusher sends the queue every batch_delay seconds. Each NOTIFY carries a
+    JSON envelope {"origin": ..., "events": [[topic, payload, compact], ...]}
+    and processes skip envelopes they sent themselves. Delivery to other
+    processes is best effort: events published while the connection is down
+    are dropped, so clients must be able to re-fetch.
+    """
+
+    # Postgres rejects NOTIFY payloads of 8000 bytes or more
+    MAX_PAYLOAD_BYTES = 7900
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str,
+        batch_delay: float,
+        inline_limit: int,
+        reconnect_delay: float = 1.0,
+    ):
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self.batch_delay = batch_delay
+        self.inline_limit = min(inline_limit, self.MAX_PAYLOAD_BYTES - 100)
+        self.reconnect_delay = reconnect_delay
+        self.origin = uuid.uuid4().hex
+        self._pending: list[str] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._connection = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._resolving: set[asyncio.Task] = set()
+
+    def _forward(self, topic: str, payload: Payload, compact: Optional[Payload]) -> None:
+        item = self._encode_item(topic, payload, compact)
+        if item is None or self._wakeup is None:
+            return
+        self._pending.append(item)
+        self._wakeup.set()
+
+    def _encode_item(
+        self, topic: str, payload: Payload, compact: Optional[Payload]
+    ) -> Optional[str]:
+        """Encode one event, falling back to its compact form when too large."""
+        item = json.dumps([topic, payload, False], separators=(",", ":"))
+        if len(item.encode()) <= self.inline_limit:
+            return item
+        if compact is not None:
+            item = json.dumps([topic, compact, True], separators=(",", ":"))
+            if len(item.encode()) <= self.inline_limit:
+                return item
+        logger.warning("Dropping %r event too large to broadcast", topic)
+        return None
+
+    def _envelopes(self, items: list[str]) -> list[str]:
+        """Pack encoded events into as few NOTIFY payloads as fit."""
+        head = '{"origin":"%s","events":[' % self.origin
+        envelopes, batch, size = [], [], len(head) + 2
+        for item in items:
+            item_size = len(item.encode()) + 1
+            if batch and size + item_size > self.MAX_PAYLOAD_BYTES:
+                envelopes.append(head + ",".join(batch) + "]}")
+                batch, size = [], len(head) + 2
+            batch.append(item)
+            size += item_size
+        if batch:
+            envelopes.append(head + ",".join(batch) + "]}")
+        return envelopes
+
+    async def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._flusher = asyncio.create_task(self._run_flusher())
+
+    async def stop(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self._flush()
+        for task in list(self._resolving):
+            task.cancel()
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    def _connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    async def _connect(self) -> None:
+        connection = await asyncpg.connect(self.dsn)
+        await connection.add_listener(self.channel, self._on_notify)
+        connection.add_termination_listener(self._on_terminated)
+        self._connection = connection
+
+    def _on_terminated(self, connection) -> None:
+        logger.warning("Event bus connection lost; reconnecting")
+        self._wakeup.set()
+
+    async def _run_flusher(self) -> None:
+        while True:
+            if not self._connected():
+                try:
+                    await self._connect()
+                except Exception:
+                    logger.exception("Event bus could not connect")
+                    await asyncio.sleep(self.reconnect_delay)
+                    continue
+            await self._wakeup.wait()
+            # Let the events published around this one join the batch
+            await asyncio.sleep(self.batch_delay)
+            self._wakeup.clear()
+            await self._flush()
+
+    async def _flush(self) -> None:
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        if not self._connected():
+            logger.warning("Event bus disconnected; dropped %d events", len(pending))
+            return
+        try:
+            for envelope in self._envelopes(pending):
+                await self._connection.execute(
+                    "SELECT pg_notify($1, $2)", self.channel, envelope
+                )
+        except Exception:
+            logger.exception("Failed to broadcast %d events", len(pending))
+
+    def _on_notify(self, connection, pid: int, channel: str, data: str) -> None:
+        try:
+            envelope = json.loads(data)
+        except ValueError:
+            logger.warning("Ignoring malformed event envelope")
+            return
+        if envelope.get("origin") == self.origin:
+            return
+        for topic, payload, compact in envelope.get("events", ()):
+            if not compact:
+                self._dispatch(topic, payload)
+            elif topic in self._resolvers:
+                task = asyncio.create_task(self._resolve(topic, payload))
+                self._resolving.add(task)
+                task.add_done_callback(self._resolving.discard)
+
+    async def _resolve(self, topic: str, compact: Payload) -> None:
+        try:
+            payload = await self._resolvers[topic](compact)
+        except Exception:
+            logger.exception("Failed to resolve %r event", topic)
+            return
+        if payload is not None:
+            self._dispatch(topic, payload)
+
+
+def create_event_bus() -> EventBus:
+    """Build the backend selected by EVENT_BUS_BACKEND."""
+    if settings.EVENT_BUS_BACKEND == "postgres":
+        return PostgresEventBus(
+            dsn=settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://"),
+            channel=settings.EVENT_BUS_CHANNEL,
+            batch_delay=settings.EVENT_BUS_BATCH_DELAY_SECONDS,
+            inline_limit=settings.EVENT_BUS_INLINE_LIMIT_BYTES,
+        )
+    return EventBus()
+
+
+bus = create_event_bus()
@@ -0,0 +1,129 @@
+"""
+Notification types and text templates.
+
+Notifications are stored compactly: a small-int type code, the user who
+caused them (actor_id), a related_id and a count. Their title and message
+are rendered from per-type templates when read; select_notifications joins
+in the actor usernames, so a page needs no further lookups.
+
+Bursts of messages from one sender collapse into a single unread
+new_message notification whose count grows ("alice sent you 10 messages").
+Ids are stable; each notification carries a per-user seq that orders the
+feed and resumes streams, and a coalesced notification takes a new one.
+"""
+
+from typing import Iterable, Optional
+
+from sqlalchemy import Select, and_, false, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.counters import next_notification_seqs
+from app.models import Message, Notification, User
+from app.schemas.notification import NotificationOut
+
+# Stored type codes; never renumber, rows keep them
+NEW_MESSAGE = 1
+MESSAGE_READ = 2
+FRIEND_REQUEST = 3
+
+TYPE_NAMES = {
+    NEW_MESSAGE: "new_message",
+    MESSAGE_READ: "message_read",
+    FRIEND_REQUEST: "friend_request",
+}
+TYPE_CODES = {name: code for code, name in TYPE_NAMES.items()}
+
+# (title, message) for a count of one, then for more
+_TEMPLATES = {
+    NEW_MESSAGE: (
+        ("New Message", "{actor} sent you a message"),
+        ("New Messages", "{actor} sent you {count} messages"),
+    ),
+    MESSAGE_READ: (
+        ("Message Read", "{actor} read your message"),
+        ("Messages Read", "{actor} read {count} of your messages"),
+    ),
+    FRIEND_REQUEST: (
+        ("Friend Request", "{actor} sent you a friend request"),
+        ("Friend Request", "{actor} sent you a friend request"),
+    ),
+}
+
+# Shown when the actor's account no longer exists
+UNKNOWN_ACTOR = "Someone"
+
+
+def select_notifications() -> Select:
+    """Select notifications with their actor's username (None once deleted)."""
+    return select(Notification, User.username).outerjoin(
+        User, User.id == Notification.actor_id
+    )
+
+
+def render_notification(
+    notification: Notification, actor_name: Optional[str]
+) -> NotificationOut:
+    """Build the response for a notification from its type's template."""
+    single, plural = _TEMPLATES[notification.type_code]
+    title, message = single if notification.count == 1 else plural
+    return NotificationOut(
+        id=notification.id,
+        user_id=notification.user_id,
+        notification_type=TYPE_NAMES[notification.type_code],
+        title=title,
+        message=message.format(
+            actor=actor_name or UNKNOWN_ACTOR, count=notification.count
+        ),
+        actor_id=notification.actor_id,
+        related_id=notification.related_id,
+        count=notification.count,
+        seq=notification.seq,
+        is_read=notification.is_read,
+        created_at=notification.created_at,
+    )
+
+
+async def notify_new_messages(
+    db: AsyncSession, messages: Iterable[Message]
+) -> list[Notification]:
+    """
+    Notify receivers of new messages, one row per sender while unread.
+
+    A receiver who already has an unread new_message notification from the
+    sender gets that row updated instead of a new one: its count grows, it
+    points at the newest message and it takes a new seq, so it moves to the
+    top of the feed and reaches streams resuming after its old seq. Its id
+    never changes. Rows with count 1 are new. Expects at most one message
+    per receiver.
+    """
+    messages = list(messages)
+    # Takes the receivers' counter rows before any conversation or notification
+    # row, the order reads use too (see app.core.counters)
+    seqs = await next_notification_seqs(db, [msg.receiver_id for msg in messages])
+    stmt = insert(Notification).values([
+        {
+            "user_id": msg.receiver_id,
+            "type_code": NEW_MESSAGE,
+            "actor_id": msg.sender_id,
+            "related_id": msg.id,
+            "seq": seqs[msg.receiver_id],
+        }
+        for msg in messages
+    ])
+    stmt = stmt.on_conflict_do_update(
+        # Literals, not bound parameters, so the partial unique index is matched
+        index_elements=[Notification.user_id, Notification.actor_id],
+        index_where=and_(
+            Notification.is_read == false(),
+            Notification.type_code == literal_column(str(NEW_MESSAGE)),
+        ),
+        set_={
+            "related_id": stmt.excluded.related_id,
+            "count": Notification.count + 1,
+            "seq": stmt.excluded.seq,
+            "created_at": stmt.excluded.created_at,
+        },
+    ).returning(Notification)
+    result = await db.execute(stmt)
+    return result.scalars().all()
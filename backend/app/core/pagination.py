@@ -0,0 +1,61 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Cursors are opaque to clients: a URL-safe base64 encoding of the sort key of
+the last row on a page.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, status
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _encode(key: list) -> str:
+    raw = json.dumps(key, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded))
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor",
+    )
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) sort key as an opaque cursor."""
+    return _encode([created_at.isoformat(), row_id])
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor, or raise a 400."""
+    try:
+        created_at, row_id = _decode(cursor)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        raise _invalid_cursor()
+
+
+def encode_id_cursor(row_id: int) -> str:
+    """Encode an integer sort key (an insertion-ordered id, or a seq)."""
+    return _encode([row_id])
+
+
+def decode_id_cursor(cursor: str) -> int:
+    """Decode a cursor produced by encode_id_cursor, or raise a 400."""
+    try:
+        (row_id,) = _decode(cursor)
+        return int(row_id)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        raise _invalid_cursor()
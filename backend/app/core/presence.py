@@ -0,0 +1,228 @@
+"""
+In-process presence tracking.
+
+Online state lives in memory and is refreshed by heartbeats (and by any
+authenticated request). Changes are written back to users.is_active in
+periodic batches, one UPDATE per batch, so presence traffic does not churn
+the users table.
+
+Each worker tracks the requests it serves, and before every flush shares
+the users it has seen (and seen log out) over the event bus, so all
+workers converge on the same view. A worker therefore only writes a user
+offline once no worker has reported seeing them within the TTL; if a
+sighting it had not yet received contradicts an offline write, it writes
+the user back online on its next flush.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Callable, Iterable, Iterator
+
+from sqlalchemy import case, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.events import bus
+from app.models import User
+
+logger = logging.getLogger(__name__)
+
+
+class PresenceRegistry:
+    """Track which users are online and queue changes for the users table."""
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._last_seen: dict[int, float] = {}
+        self._pending: dict[int, bool] = {}
+        # Users seen here, and users who left here, since the last share
+        self._sightings: set[int] = set()
+        self._departures: dict[int, float] = {}
+        # Last sighting of users this worker expired, while a delayed
+        # sighting from another worker could still contradict it
+        self._expired: dict[int, float] = {}
+
+    def heartbeat(self, user_id: int) -> None:
+        """Record activity from a user, queueing a write if they just came online."""
+        if not self.is_online(user_id):
+            self._pending[user_id] = True
+        self._last_seen[user_id] = self._clock()
+        self._sightings.add(user_id)
+        self._expired.pop(user_id, None)
+
+    def mark_online(self, user_id: int, persisted: bool = False) -> None:
+        """Mark a user online; persisted=True when the caller already wrote the row."""
+        self._last_seen[user_id] = self._clock()
+        self._sightings.add(user_id)
+        self._expired.pop(user_id, None)
+        if persisted:
+            self._pending.pop(user_id, None)
+        else:
+            self._pending[user_id] = True
+
+    def mark_offline(self, user_id: int, persisted: bool = False) -> None:
+        """Mark a user offline; persisted=True when the caller already wrote the row."""
+        self._last_seen.pop(user_id, None)
+        self._sightings.discard(user_id)
+        self._departures[user_id] = self._clock()
+        if persisted:
+            self._pending.pop(user_id, None)
+        else:
+            self._pending[user_id] = False
+
+    def is_online(self, user_id: int) -> bool:
+        """Return whether a user has been seen within the TTL."""
+        last_seen = self._last_seen.get(user_id)
+        return last_seen is not None and self._clock() - last_seen < self.ttl
+
+    def online(self, user_ids: Iterable[int]) -> list[int]:
+        """Return the subset of user_ids that are online, in the given order."""
+        return [user_id for user_id in dict.fromkeys(user_ids) if self.is_online(user_id)]
+
+    def take_sightings(self) -> dict[str, list[list[float]]]:
+        """
+        Return and reset what this worker saw since the last call.
+
+        "seen" and "left" hold [user_id, seconds ago] pairs; ages rather than
+        timestamps, since each worker has its own monotonic clock.
+        """
+        now = self._clock()
+        seen = [
+            [user_id, round(now - self._last_seen[user_id], 3)]
+            for user_id in self._sightings
+            if user_id in self._last_seen
+        ]
+        left = [
+            [user_id, round(now - left_at, 3)]
+            for user_id, left_at in self._departures.items()
+        ]
+        self._sightings.clear()
+        self._departures.clear()
+        return {"seen": seen, "left": left}
+
+    def merge_sightings(self, sightings: dict[str, list[list[float]]]) -> None:
+        """
+        Record what another worker saw.
+
+        Writes stay with the worker that saw the transition, except that a
+        user this worker already expired is queued online again when the
+        sighting is newer than the one it expired them on.
+        """
+        now = self._clock()
+        for user_id, age in sightings.get("seen", ()):
+            if age >= self.ttl:
+                continue
+            seen = now - age
+            if seen <= self._last_seen.get(user_id, float("-inf")):
+                continue
+            expired_on = self._expired.pop(user_id, None)
+            if expired_on is not None and seen > expired_on:
+                self._pending[user_id] = True
+            self._last_seen[user_id] = seen
+        for user_id, age in sightings.get("left", ()):
+            if self._last_seen.get(user_id, float("inf")) <= now - age:
+                del self._last_seen[user_id]
+
+    def expire(self) -> int:
+        """Drop users whose heartbeat lapsed and queue them as offline."""
+        cutoff = self._clock() - self.ttl
+        stale = [user_id for user_id, seen in self._last_seen.items() if seen <= cutoff]
+        for user_id in stale:
+            self._expired[user_id] = self._last_seen.pop(user_id)
+            self._pending[user_id] = False
+        # Sightings are shared every flush, well within a TTL
+        self._expired = {
+            user_id: seen
+            for user_id, seen in self._expired.items()
+            if seen > cutoff - self.ttl
+        }
+        return len(stale)
+
+    async def flush(self, db: AsyncSession) -> int:
+        """Write queued changes to users.is_active with a single UPDATE."""
+        self.expire()
+        if not self._pending:
+            return 0
+
+        pending, self._pending = self._pending, {}
+        try:
+            await db.execute(
+                update(User)
+                .where(User.id.in_(pending))
+                .values(is_active=case(pending, value=User.id))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        except Exception:
+            # Keep anything that changed again while we were writing
+            self._pending = {**pending, **self._pending}
+            raise
+
+        return len(pending)
+
+    def clear(self) -> None:
+        """Forget all presence state."""
+        self._last_seen.clear()
+        self._pending.clear()
+        self._sightings.clear()
+        self._departures.clear()
+        self._expired.clear()
+
+
+def _split_sightings(
+    sightings: dict[str, list[list[float]]], limit: int
+) -> Iterator[dict[str, list[list[float]]]]:
+    """
+    Split sightings into events whose encoding stays within limit bytes.
+
+    Sizes are counted as the bus encodes them. All "seen" pairs go out
+    before any "left" pair, the order merge_sightings applies them in.
+    """
+    empty = json.dumps(["presence", {"seen": [], "left": []}, False], separators=(",", ":"))
+    chunk, size = {"seen": [], "left": []}, len(empty)
+    for key in ("seen", "left"):
+        for pair in sightings[key]:
+            pair_size = len(json.dumps(pair, separators=(",", ":"))) + 1
+            if size + pair_size > limit and (chunk["seen"] or chunk["left"]):
+                yield chunk
+                chunk, size = {"seen": [], "left": []}, len(empty)
+            chunk[key].append(pair)
+            size += pair_size
+    if chunk["seen"] or chunk["left"]:
+        yield chunk
+
+
+def share_sightings(registry: PresenceRegistry) -> None:
+    """Publish what this worker saw to the other workers."""
+    sightings = registry.take_sightings()
+    # The bus drops events over its inline limit, so large shares go out in parts
+    for chunk in _split_sightings(sightings, settings.EVENT_BUS_INLINE_LIMIT_BYTES):
+        bus.publish("presence", chunk)
+
+
+def _merge_sightings(payload: dict) -> None:
+    presence.merge_sightings(payload)
+
+
+async def run_flush_loop(
+    registry: PresenceRegistry,
+    session_factory: Callable[[], AsyncSession],
+    interval: float,
+) -> None:
+    """Share sightings and flush presence changes every interval seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        share_sightings(registry)
+        try:
+            async with session_factory() as db:
+                await registry.flush(db)
+        except Exception:
+            logger.exception("Failed to flush presence changes")
+
+
+presence = PresenceRegistry(ttl=settings.PRESENCE_TTL_SECONDS)
+
+bus.subscribe("presence", _merge_sightings)
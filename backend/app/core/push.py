@@ -0,0 +1,196 @@
+"""
+In-process push hub for streaming clients (WebSocket and SSE).
+
+Endpoints publish events for a user after their transaction commits, and
+every open connection of that user receives them. Each connection has a
+bounded send queue; a client that falls that far behind is disconnected
+rather than buffered without limit, and is expected to reconnect and
+re-fetch. Connections are held per process; publish_event goes through the
+event bus so that connections held by other workers receive events too.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Collection, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.events import bus
+from app.db.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Close codes sent to the client when the hub ends a connection
+CLOSE_SLOW_CONSUMER = 1013  # Try again later
+CLOSE_SHUTDOWN = 1001  # Going away
+
+
+class Subscription:
+    """One connection's queue of pending events."""
+
+    def __init__(
+        self,
+        user_id: int,
+        queue_size: int,
+        event_types: Optional[Collection[str]] = None,
+    ):
+        self.user_id = user_id
+        self.queue_size = queue_size
+        self.event_types = event_types
+        # One slot beyond queue_size is kept free for the close signal
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size + 1)
+        self._loop = asyncio.get_running_loop()
+        self.close_code: Optional[int] = None
+
+    async def get(self) -> Optional[dict[str, Any]]:
+        """Wait for the next event; None means the hub closed this connection."""
+        return await self._queue.get()
+
+    def _offer(self, event: dict[str, Any]) -> bool:
+        """Queue an event, or return False if the connection is too far behind."""
+        if self.close_code is not None:
+            return True
+        if self.event_types is not None and event["type"] not in self.event_types:
+            return True
+        if self._queue.qsize() >= self.queue_size:
+            return False
+        self._queue.put_nowait(event)
+        return True
+
+    def _close(self, code: int) -> None:
+        """Queue the close signal behind any events already pending."""
+        if self.close_code is None:
+            self.close_code = code
+            self._queue.put_nowait(None)
+
+
+class PushHub:
+    """Fan events out to each user's open connections."""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscriptions: dict[int, set[Subscription]] = {}
+        self._closing = False
+        self._drained: Optional[asyncio.Event] = None
+        self.dropped = 0
+
+    def subscribe(
+        self, user_id: int, event_types: Optional[Collection[str]] = None
+    ) -> Optional[Subscription]:
+        """
+        Register a connection for a user; returns None once shutdown began.
+
+        Pass event_types to receive only events of those types.
+        """
+        if self._closing:
+            return None
+        subscription = Subscription(user_id, self.queue_size, event_types)
+        self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Forget a connection after it ended."""
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.user_id]
+        if self._drained is not None and not self._subscriptions:
+            self._drained.set()
+
+    def connections(self, user_id: Optional[int] = None) -> int:
+        """Return the number of open connections, overall or for one user."""
+        if user_id is not None:
+            return len(self._subscriptions.get(user_id, ()))
+        return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def publish(self, user_id: int, event: dict[str, Any]) -> int:
+        """Queue an event for every connection of a user; returns how many."""
+        subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            self._deliver(subscription, event)
+        return len(subscriptions)
+
+    def _deliver(self, subscription: Subscription, event: dict[str, Any]) -> None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not subscription._loop:
+            # Queues are bound to the loop serving the connection
+            subscription._loop.call_soon_threadsafe(self._deliver, subscription, event)
+            return
+
+        if not subscription._offer(event):
+            logger.warning(
+                "Disconnecting slow push consumer for user %s", subscription.user_id
+            )
+            self.dropped += 1
+            subscription._close(CLOSE_SLOW_CONSUMER)
+
+    async def shutdown(self, timeout: float) -> None:
+        """Stop accepting connections and let open ones drain their queues."""
+        self._closing = True
+        if not self._subscriptions:
+            return
+
+        self._drained = asyncio.Event()
+        for subscriptions in list(self._subscriptions.values()):
+            for subscription in subscriptions:
+                subscription._loop.call_soon_threadsafe(
+                    subscription._close, CLOSE_SHUTDOWN
+                )
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "%d push connections still open after shutdown", self.connections()
+            )
+
+
+hub = PushHub(queue_size=settings.PUSH_QUEUE_SIZE)
+
+
+# Rebuild an event from its id when it was too large to broadcast inline
+EventLoader = Callable[[AsyncSession, int], Awaitable[Optional[dict[str, Any]]]]
+_loaders: dict[str, EventLoader] = {}
+
+
+def register_loader(event_type: str, loader: EventLoader) -> None:
+    """Register how to fetch an event of this type by id."""
+    _loaders[event_type] = loader
+
+
+def publish_event(
+    user_id: int, event: dict[str, Any], ref_id: Optional[int] = None
+) -> None:
+    """
+    Publish an event to a user's connections in every process.
+
+    ref_id identifies the event for its type's loader, so other processes
+    can fetch it when it is too large to broadcast.
+    """
+    compact = None
+    if ref_id is not None:
+        compact = {"user_id": user_id, "type": event["type"], "id": ref_id}
+    bus.publish("push", {"user_id": user_id, "event": event}, compact=compact)
+
+
+def _deliver(payload: dict[str, Any]) -> None:
+    hub.publish(payload["user_id"], payload["event"])
+
+
+async def _resolve(compact: dict[str, Any]) -> Optional[dict[str, Any]]:
+    # Only fetch when this process holds a connection for the user
+    loader = _loaders.get(compact["type"])
+    if loader is None or not hub.connections(compact["user_id"]):
+        return None
+    async with AsyncSessionLocal() as db:
+        event = await loader(db, compact["id"])
+    if event is None:
+        return None
+    return {"user_id": compact["user_id"], "event": event}
+
+
+bus.subscribe("push", _deliver, resolve=_resolve)
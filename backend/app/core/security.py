@@ -2,18 +2,27 @@
 Security utilities for authentication.
 """
 
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, TypeVar
 from jose import jwt
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.events import bus
+from app.core.presence import presence
 from app.models import User
+from app.schemas.user import Principal
 from app.db.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import make_transient_to_detached
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -29,6 +38,88 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """
+    Run bcrypt hashing and verification off the event loop.
+
+    bcrypt releases the GIL while it works, so a small thread pool gives real
+    parallelism without blocking other requests on the worker. Admission is
+    bounded: once every worker is busy and the queue is full, callers get an
+    immediate 503 instead of piling up behind the pool.
+    """
+
+    def __init__(self, max_workers: int, queue_size: int):
+        self.max_workers = max_workers
+        self.max_pending = max_workers + queue_size
+        self.pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Lazily create the worker pool."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        """Run func on the pool, rejecting the call if the queue is full."""
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again",
+                headers={"Retry-After": "1"},
+            )
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash without blocking the event loop."""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        """Hash a password without blocking the event loop."""
+        return await self._run(get_password_hash, password)
+
+    async def hash_many(self, passwords: list[str]) -> list[str]:
+        """
+        Hash a batch of passwords in parallel across the pool.
+
+        Intended for trusted bulk jobs, so it bypasses the admission limit
+        that protects interactive requests.
+        """
+        loop = asyncio.get_running_loop()
+        return list(
+            await asyncio.gather(
+                *(
+                    loop.run_in_executor(self.executor, get_password_hash, password)
+                    for password in passwords
+                )
+            )
+        )
+
+    def shutdown(self) -> None:
+        """Stop the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -36,30 +127,87 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
+# Verified claims keyed by raw token, so repeat requests skip the signature check
+token_cache: TTLCache[str, dict] = TTLCache(
+    max_size=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decode a JWT access token."""
+    """Decode a JWT access token, reusing verified claims until the token expires."""
+    cached = token_cache.get(token)
+    if cached is not None and cached["exp"] > time.time():
+        return dict(cached)
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except Exception:
+        token_cache.invalidate(token)
         return None
 
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        token_cache.set(token, dict(payload), ttl=exp - time.time())
+
+    return payload
+
 
 # OAuth2 scheme for Bearer tokens
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# Column values of recently authenticated users, keyed by token subject
+user_cache: TTLCache[str, dict] = TTLCache(
+    max_size=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
 
-async def get_current_user(
-    request: Request,
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get the current authenticated user from the access token cookie."""
-    token = request.cookies.get("access_token")
+_USER_CACHE_COLUMNS = [column.key for column in User.__table__.columns]
+
+
+def invalidate_cached_user(username: str) -> None:
+    """Drop a user from the cache, in every worker, after their row changed."""
+    bus.publish("user_cache", {"username": username})
+
+
+def _drop_cached_user(payload: dict) -> None:
+    user_cache.invalidate(payload["username"])
+
+
+bus.subscribe("user_cache", _drop_cached_user)
 
+
+async def load_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
+    """
+    Load a user, serving repeat lookups from the cache.
+
+    Cache hits are attached to the session as persistent instances without a
+    SELECT, so handlers can still modify them or lazy-load relationships.
+    """
+    cached = user_cache.get(username)
+    if cached is not None:
+        user = User(**cached)
+        make_transient_to_detached(user)
+        db.add(user)
+        return user
+
+    result = await db.execute(select(User).where(User.username == username))
+    user = result.scalar_one_or_none()
+
+    if user is not None:
+        user_cache.set(
+            username, {key: getattr(user, key) for key in _USER_CACHE_COLUMNS}
+        )
+
+    return user
+
+
+def get_token_claims(token: Optional[str]) -> dict:
+    """Verify an access token and return its claims, or raise a 401."""
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -68,23 +216,68 @@ async def get_current_user(
         )
 
     payload = decode_access_token(token)
-    if payload is None:
+    if payload is None or payload.get("sub") is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication token",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    username: str = payload.get("sub")
-    if username is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    return payload
 
-    result = await db.execute(select(User).where(User.username == username))
-    user = result.scalar_one_or_none()
+
+async def principal_from_claims(payload: dict, db: AsyncSession) -> Principal:
+    """
+    Build the caller's identity from verified token claims.
+
+    Tokens issued at login carry the user id, so no query is needed. Older
+    tokens that only carry a username fall back to a (cached) user lookup.
+    """
+    username: str = payload["sub"]
+    user_id = payload.get("uid")
+    issued_at = payload.get("iat")
+
+    if user_id is None:
+        user = await load_user_by_username(db, username)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        user_id = user.id
+
+    return Principal(
+        id=user_id,
+        username=username,
+        issued_at=datetime.utcfromtimestamp(issued_at) if issued_at else None,
+    )
+
+
+async def get_current_principal(
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """Get the authenticated caller's id and username without loading the user."""
+    payload = get_token_claims(request.cookies.get("access_token"))
+    principal = await principal_from_claims(payload, db)
+    # Any authenticated request counts as a presence heartbeat
+    presence.heartbeat(principal.id)
+    return principal
+
+
+async def get_current_user(
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    Get the current authenticated user from the access token cookie.
+
+    Only endpoints that need the ORM row (to modify it or walk relationships)
+    should depend on this; the rest should use get_current_principal.
+    """
+    payload = get_token_claims(request.cookies.get("access_token"))
+    user = await load_user_by_username(db, payload["sub"])
 
     if user is None:
         raise HTTPException(
@@ -93,4 +286,5 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    presence.heartbeat(user.id)
     return user
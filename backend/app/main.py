@@ -3,10 +3,17 @@ Awkward Turtle - FastAPI Backend
 Main application entry point
 """
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from app.api import router as api_router
-from app.db import engine, Base
+from app.core.compaction import compactor, run_compaction_loop
+from app.core.config import settings
+from app.core.events import bus
+from app.core.presence import presence, run_flush_loop
+from app.core.push import hub
+from app.core.security import password_hasher, token_cache, user_cache
+from app.db import engine, AsyncSessionLocal, Base
 
 
 @asynccontextmanager
@@ -15,8 +22,38 @@ async def lifespan(app: FastAPI):
     # Startup: Create database tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    # Startup: Connect the event bus that fans events out to other workers
+    await bus.start()
+    # Startup: Flush presence changes to the users table in the background
+    presence_flusher = asyncio.create_task(
+        run_flush_loop(
+            presence, AsyncSessionLocal, settings.PRESENCE_FLUSH_INTERVAL_SECONDS
+        )
+    )
+    # Startup: Trim notification history beyond the configured limits
+    notification_compactor = asyncio.create_task(
+        run_compaction_loop(
+            compactor,
+            AsyncSessionLocal,
+            settings.NOTIFICATION_COMPACTION_INTERVAL_SECONDS,
+        )
+    )
     yield
+    # Shutdown: Let push connections drain their queues and close
+    await hub.shutdown(settings.PUSH_SHUTDOWN_TIMEOUT_SECONDS)
+    await bus.stop()
+    # Shutdown: Stop notification compaction (a half-done run resumes next time)
+    notification_compactor.cancel()
+    with suppress(asyncio.CancelledError):
+        await notification_compactor
+    # Shutdown: Stop the flusher and write out any pending presence changes
+    presence_flusher.cancel()
+    with suppress(asyncio.CancelledError):
+        await presence_flusher
+    async with AsyncSessionLocal() as db:
+        await presence.flush(db)
     # Shutdown: Cleanup if needed
+    password_hasher.shutdown()
     await engine.dispose()
 
 
@@ -34,7 +71,11 @@ app.include_router(api_router, prefix="/api/v1")
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "caches": {"users": user_cache.stats(), "tokens": token_cache.stats()},
+        "notification_compaction": compactor.stats(),
+    }
 
 
 @app.get("/")
@@ -2,19 +2,59 @@
 Models module - Database models (ORM).
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Table
+from sqlalchemy import (
+    Column,
+    Integer,
+    SmallInteger,
+    String,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    Table,
+    and_,
+    false,
+    literal_column,
+    func,
+)
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.functions import GenericFunction
 from datetime import datetime
 
 Base = declarative_base()
 
+
+class least(GenericFunction):
+    """LEAST(a, b, ...); SQLite spells it as the multi-argument min()."""
+
+    inherit_cache = True
+
+
+class greatest(GenericFunction):
+    """GREATEST(a, b, ...); SQLite spells it as the multi-argument max()."""
+
+    inherit_cache = True
+
+
+@compiles(least, "sqlite")
+def _sqlite_least(element, compiler, **kw):
+    return "min(%s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(greatest, "sqlite")
+def _sqlite_greatest(element, compiler, **kw):
+    return "max(%s)" % compiler.process(element.clauses, **kw)
+
 # Association table for friendships (many-to-many)
 friendships = Table(
     "friendships",
     Base.metadata,
     Column("user1_id", Integer, ForeignKey("users.id"), primary_key=True),
     Column("user2_id", Integer, ForeignKey("users.id"), primary_key=True),
+    # The primary key serves friends lookups (user1_id); this serves the reverse side
+    Index("ix_friendships_user2_user1", "user2_id", "user1_id"),
 )
 
 
@@ -50,7 +90,7 @@ class User(Base):
 
 
 class Message(Base):
-    """Message model with read receipt tracking."""
+    """Message model. Read state lives in ConversationReadState."""
 
     __tablename__ = "messages"
 
@@ -58,11 +98,28 @@ class Message(Base):
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     receiver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     content = Column(String, nullable=False)
+    # Legacy per-message read flags; no longer written since the read watermark
     is_read = Column(Boolean, default=False)
     read_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Inbox / outbox pages: filter on one party, newest first
+        Index("ix_messages_receiver_created", receiver_id, created_at.desc(), id.desc()),
+        Index("ix_messages_sender_created", sender_id, created_at.desc(), id.desc()),
+        # Unread count for one conversation: the rows above the reader's watermark
+        Index("ix_messages_receiver_sender_id", receiver_id, sender_id, id),
+        # Two-party history: both directions of a conversation share one key range
+        Index(
+            "ix_messages_pair_created",
+            func.least(sender_id, receiver_id),
+            func.greatest(sender_id, receiver_id),
+            created_at.desc(),
+            id.desc(),
+        ),
+    )
+
     # Relationships
     sender = relationship(
         "User", foreign_keys=[sender_id], back_populates="sent_messages"
@@ -75,6 +132,64 @@ class Message(Base):
         return f"<Message(id={self.id}, sender_id={self.sender_id}, receiver_id={self.receiver_id})>"
 
 
+class ConversationReadState(Base):
+    """Read watermark: reader has read every message from peer up to last_read_message_id."""
+
+    __tablename__ = "conversation_read_state"
+
+    reader_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    peer_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    last_read_message_id = Column(Integer, nullable=False)
+    read_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return (
+            f"<ConversationReadState(reader_id={self.reader_id}, peer_id={self.peer_id}, "
+            f"last_read_message_id={self.last_read_message_id})>"
+        )
+
+
+class Conversation(Base):
+    """Per-user summary of one conversation, kept current by sends and reads."""
+
+    __tablename__ = "conversations"
+
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    peer_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    last_message_id = Column(Integer, nullable=False)
+    last_sender_id = Column(Integer, nullable=False)
+    last_message_preview = Column(String, nullable=False)
+    last_message_at = Column(DateTime, nullable=False)
+    unread_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Conversation list: most recent first
+        Index(
+            "ix_conversations_owner_recent", owner_id, last_message_at.desc(), peer_id.desc()
+        ),
+    )
+
+    def __repr__(self):
+        return f"<Conversation(owner_id={self.owner_id}, peer_id={self.peer_id})>"
+
+
+class UserCounters(Base):
+    """Per-user unread counters, maintained incrementally for the badge."""
+
+    __tablename__ = "user_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    unread_messages = Column(Integer, nullable=False, default=0)
+    unread_notifications = Column(Integer, nullable=False, default=0)
+    # All stored notifications, read or not; compaction picks users from it
+    total_notifications = Column(Integer, nullable=False, default=0)
+    # Last sequence number handed to one of the user's notifications
+    notification_seq = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<UserCounters(user_id={self.user_id})>"
+
+
 class Notification(Base):
     """Notification model for alerts (new messages, read receipts)."""
 
@@ -82,19 +197,42 @@ class Notification(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    notification_type = Column(
-        String, nullable=False
-    )  # 'new_message', 'message_read', 'friend_request'
-    title = Column(String, nullable=False)
-    message = Column(String, nullable=True)
+    # Title and message are rendered from per-type templates when read
+    type_code = Column(SmallInteger, nullable=False)  # See app.core.notifications
+    actor_id = Column(
+        Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )  # User who caused it (sender, reader)
     related_id = Column(Integer, nullable=True)  # ID of related message/user
+    count = Column(Integer, nullable=False, default=1)  # Events it stands for
+    # Per-user feed and stream order; a coalesced notification takes a new one
+    seq = Column(Integer, nullable=False)
     is_read = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Notification feed (newest first) and stream resume (after a seq)
+        Index("uq_notifications_user_seq", user_id, seq.desc(), unique=True),
+        # Unread badge / unread-only feed
+        Index(
+            "ix_notifications_user_unread",
+            user_id,
+            seq.desc(),
+            postgresql_where=is_read == false(),
+            sqlite_where=is_read == false(),
+        ),
+        # One unread new_message notification (type code 1) per sender; sends upsert it
+        Index(
+            "uq_notifications_unread_new_message",
+            user_id,
+            actor_id,
+            unique=True,
+            postgresql_where=and_(is_read == false(), type_code == literal_column("1")),
+            sqlite_where=and_(is_read == false(), type_code == literal_column("1")),
+        ),
+    )
+
     # Relationship
-    user = relationship("User", backref="notifications")
+    user = relationship("User", foreign_keys=[user_id], backref="notifications")
 
     def __repr__(self):
-        return (
-            f"<Notification(type='{self.notification_type}', user_id={self.user_id})>"
-        )
+        return f"<Notification(type_code={self.type_code}, user_id={self.user_id})>"
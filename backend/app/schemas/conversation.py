@@ -0,0 +1,24 @@
+"""
+Conversation-related Pydantic schemas.
+"""
+
+from datetime import datetime
+from pydantic import BaseModel
+
+
+class ConversationSummary(BaseModel):
+    """Schema for one entry in the conversation list."""
+    peer_id: int
+    peer_username: str
+    last_message_id: int
+    last_sender_id: int
+    last_message_preview: str
+    last_message_at: datetime
+    unread_count: int
+
+
+class ConversationListOut(BaseModel):
+    """Schema for conversation list response (one page)."""
+    conversations: list[ConversationSummary]
+    total: int  # Conversations on this page
+    next_cursor: str | None = None
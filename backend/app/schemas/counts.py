@@ -0,0 +1,11 @@
+"""
+Unread count Pydantic schemas.
+"""
+
+from pydantic import BaseModel
+
+
+class CountsOut(BaseModel):
+    """Schema for the unread badge counts."""
+    unread_messages: int
+    unread_notifications: int
@@ -3,7 +3,12 @@ Message-related Pydantic schemas.
 """
 
 from datetime import datetime
-from pydantic import BaseModel, Field
+from typing import Literal
+
+from pydantic import BaseModel, Field, PositiveInt, model_validator
+
+MAX_MULTICAST_RECIPIENTS = 100
+MAX_BATCH_READ_IDS = 500
 
 
 class MessageBase(BaseModel):
@@ -16,6 +21,11 @@ class MessageCreate(MessageBase):
     to_user_id: int = Field(..., gt=0)
 
 
+class MessageMulticastCreate(MessageBase):
+    """Schema for sending one message to several users."""
+    to_user_ids: list[PositiveInt] = Field(..., min_length=1, max_length=MAX_MULTICAST_RECIPIENTS)
+
+
 class MessageOut(BaseModel):
     """Schema for message response."""
     id: int
@@ -30,19 +40,70 @@ class MessageOut(BaseModel):
         from_attributes = True
 
 
+class RecipientResult(BaseModel):
+    """Outcome of a multicast send for one recipient."""
+    to_user_id: int
+    status: Literal["sent", "not_found"]
+    message: MessageOut | None = None
+
+
+class MulticastOut(BaseModel):
+    """Schema for multicast send response, in request order."""
+    results: list[RecipientResult]
+    sent: int
+
+
 class InboxOut(BaseModel):
-    """Schema for inbox response."""
+    """Schema for inbox response (one page)."""
     messages: list[MessageOut]
-    total: int
+    total: int  # Messages on this page
+    next_cursor: str | None = None
 
 
 class OutboxOut(BaseModel):
-    """Schema for outbox response."""
+    """Schema for outbox response (one page)."""
+    messages: list[MessageOut]
+    total: int  # Messages on this page
+    next_cursor: str | None = None
+
+
+class ConversationOut(BaseModel):
+    """Schema for two-party conversation response (one page)."""
+    peer_id: int
     messages: list[MessageOut]
-    total: int
+    total: int  # Messages on this page
+    next_cursor: str | None = None
 
 
 class ReadReceipt(BaseModel):
     """Schema for read receipt confirmation."""
     message_id: int
     read_at: datetime
+
+
+class BatchReadRequest(BaseModel):
+    """Schema for marking several messages as read.
+
+    Either a list of message ids, or sender_id with up_to_id to mark
+    everything from that sender up to and including that message.
+    """
+    message_ids: list[PositiveInt] | None = Field(
+        None, min_length=1, max_length=MAX_BATCH_READ_IDS
+    )
+    sender_id: PositiveInt | None = None
+    up_to_id: PositiveInt | None = None
+
+    @model_validator(mode="after")
+    def check_selector(self):
+        by_range = self.sender_id is not None or self.up_to_id is not None
+        if self.message_ids is not None and by_range:
+            raise ValueError("Give either message_ids or sender_id with up_to_id, not both")
+        if self.message_ids is None and (self.sender_id is None or self.up_to_id is None):
+            raise ValueError("Give message_ids, or both sender_id and up_to_id")
+        return self
+
+
+class BatchReadReceipt(BaseModel):
+    """Schema for batch read confirmation."""
+    message_ids: list[int]  # Messages that changed from unread to read
+    read_at: datetime | None = None
@@ -3,7 +3,9 @@ Notification-related Pydantic schemas.
 """
 
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, PositiveInt
+
+MAX_BATCH_NOTIFICATION_IDS = 500
 
 
 class NotificationBase(BaseModel):
@@ -15,17 +17,30 @@ class NotificationBase(BaseModel):
 
 
 class NotificationOut(NotificationBase):
-    """Schema for notification response."""
+    """Schema for notification response (text rendered from its template)."""
     id: int
     user_id: int
+    actor_id: int | None = None
+    count: int = 1
+    seq: int  # Feed and stream order, per user
     is_read: bool
     created_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 class NotificationsList(BaseModel):
-    """Schema for notifications list response."""
+    """Schema for notifications list response (one page)."""
     notifications: list[NotificationOut]
-    total: int
+    total: int  # Notifications on this page
+    next_cursor: str | None = None
+
+
+class NotificationBatchRead(BaseModel):
+    """Schema for marking several notifications as read."""
+    notification_ids: list[PositiveInt] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_NOTIFICATION_IDS
+    )
+
+
+class NotificationsUpdated(BaseModel):
+    """Schema for a bulk update result."""
+    updated: int  # Notifications that changed from unread to read
@@ -0,0 +1,16 @@
+"""
+Presence-related Pydantic schemas.
+"""
+
+from pydantic import BaseModel
+
+
+class HeartbeatOut(BaseModel):
+    """Schema for heartbeat acknowledgement."""
+    user_id: int
+    ttl_seconds: float
+
+
+class PresenceOut(BaseModel):
+    """Schema for bulk online-status lookup."""
+    online: list[int]
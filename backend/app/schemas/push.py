@@ -0,0 +1,31 @@
+"""
+Push event Pydantic schemas.
+"""
+
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel
+
+from app.schemas.message import MessageOut
+from app.schemas.notification import NotificationOut
+
+
+class NewMessageEvent(BaseModel):
+    """Schema for a message pushed to its receiver."""
+    type: Literal["new_message"] = "new_message"
+    message: MessageOut
+
+
+class MessageReadEvent(BaseModel):
+    """Schema for a read receipt pushed to the sender."""
+    type: Literal["message_read"] = "message_read"
+    reader_id: int
+    message_ids: list[int]
+    read_at: datetime
+
+
+class NotificationEvent(BaseModel):
+    """Schema for a notification pushed to its user."""
+    type: Literal["notification"] = "notification"
+    notification: NotificationOut
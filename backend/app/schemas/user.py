@@ -54,3 +54,11 @@ class UserStatusUpdate(BaseModel):
     """Schema for user status update."""
 
     is_active: bool
+
+
+class Principal(BaseModel):
+    """Authenticated caller, built from signed access token claims."""
+
+    id: int
+    username: str
+    issued_at: datetime | None = None
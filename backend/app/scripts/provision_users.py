@@ -0,0 +1,109 @@
+"""
+Bulk user provisioning.
+
+Imports a CSV with ``username`` and ``password`` columns, hashes passwords in
+parallel on the password worker pool and inserts users in batches. Existing
+usernames are skipped, so a partially applied import can simply be re-run.
+
+Usage (from backend/):
+    python -m app.scripts.provision_users users.csv [--batch-size 500]
+"""
+
+import argparse
+import asyncio
+import csv
+import time
+from typing import Iterable
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import PasswordHasher, password_hasher
+from app.models import User
+from app.schemas.user import UserCreate
+
+
+class ProvisionReport(BaseModel):
+    """Outcome of a provisioning run."""
+
+    created: int = 0
+    existing: list[str] = []
+    invalid: list[str] = []
+    elapsed_seconds: float = 0.0
+
+
+def _validated(rows: Iterable[tuple[str, str]], report: ProvisionReport) -> list[UserCreate]:
+    """Validate rows against the registration schema and drop duplicates."""
+    users: dict[str, UserCreate] = {}
+    for username, password in rows:
+        try:
+            user = UserCreate(username=username, password=password)
+        except ValidationError:
+            report.invalid.append(username)
+            continue
+        users.setdefault(user.username, user)
+    return list(users.values())
+
+
+async def provision_users(
+    db: AsyncSession,
+    rows: Iterable[tuple[str, str]],
+    batch_size: int = 500,
+    hasher: PasswordHasher = password_hasher,
+) -> ProvisionReport:
+    """Create users from (username, password) pairs in batches."""
+    report = ProvisionReport()
+    started = time.perf_counter()
+    users = _validated(rows, report)
+
+    for offset in range(0, len(users), batch_size):
+        batch = users[offset : offset + batch_size]
+        hashes = await hasher.hash_many([user.password for user in batch])
+
+        result = await db.execute(
+            insert(User)
+            .on_conflict_do_nothing(index_elements=[User.username])
+            .returning(User.username),
+            [
+                {"username": user.username, "hashed_password": hashed, "is_active": True}
+                for user, hashed in zip(batch, hashes)
+            ],
+        )
+        created = set(result.scalars().all())
+        await db.commit()
+
+        report.created += len(created)
+        report.existing.extend(u.username for u in batch if u.username not in created)
+
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
+
+
+def _read_csv(path: str) -> list[tuple[str, str]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return [(row["username"], row["password"]) for row in csv.DictReader(f)]
+
+
+async def _main(path: str, batch_size: int) -> None:
+    from app.db.database import AsyncSessionLocal, engine
+
+    try:
+        async with AsyncSessionLocal() as db:
+            report = await provision_users(db, _read_csv(path), batch_size=batch_size)
+    finally:
+        password_hasher.shutdown()
+        await engine.dispose()
+
+    print(f"created:  {report.created}")
+    print(f"existing: {len(report.existing)}")
+    print(f"invalid:  {len(report.invalid)}")
+    print(f"elapsed:  {report.elapsed_seconds:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-create users from a CSV file.")
+    parser.add_argument("csv_path", help="CSV file with username,password columns")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(_main(args.csv_path, args.batch_size))
@@ -0,0 +1,43 @@
+"""
+Unread counter repair.
+
+Recomputes user_counters from messages, read watermarks and notifications,
+and rewrites only the rows that drifted. Safe to run at any time, e.g. from
+cron.
+
+Usage (from backend/):
+    python -m app.scripts.repair_counters [--user-id 42 ...]
+"""
+
+import argparse
+import asyncio
+from typing import Optional
+
+from app.core.counters import reconcile_counters
+
+
+async def _main(user_ids: Optional[list[int]]) -> None:
+    from app.db.database import AsyncSessionLocal, engine
+
+    try:
+        async with AsyncSessionLocal() as db:
+            repaired = await reconcile_counters(db, user_ids)
+    finally:
+        await engine.dispose()
+
+    print(f"repaired: {len(repaired)}")
+    if repaired:
+        print("users:    " + ", ".join(str(user_id) for user_id in repaired))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute unread counters.")
+    parser.add_argument(
+        "--user-id",
+        type=int,
+        action="append",
+        dest="user_ids",
+        help="Only repair this user (repeatable); default is every user",
+    )
+    args = parser.parse_args()
+    asyncio.run(_main(args.user_ids))
@@ -0,0 +1 @@
+"""Micro-benchmarks for the Awkward Turtle backend."""
@@ -0,0 +1,121 @@
+"""
+Storage and read latency benchmark for notifications.
+
+Seeds a scratch schema on the configured Postgres database through the
+send_message_to_many handler (every user messages every other user, for a
+number of rounds), then reports the size of the notifications table and the
+latency of get_notifications for one page, one session per call (as get_db
+does).
+
+Usage (from backend/):
+    python -m benchmarks.bench_notifications [users] [rounds] [iterations]
+"""
+
+import asyncio
+import sys
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.messages import send_message_to_many
+from app.api.notifications import get_notifications
+from app.core.config import settings
+from app.models import Base, User
+from app.schemas.message import MessageMulticastCreate
+from app.schemas.user import Principal
+
+SCHEMA = "notification_bench"
+PAGE_SIZE = 50
+
+
+async def main(users: int, rounds: int, iterations: int) -> None:
+    engine = create_async_engine(
+        settings.DATABASE_URL,
+        connect_args={"server_settings": {"search_path": SCHEMA}},
+    )
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.commit()
+
+        async with session_factory() as db:
+            rows = [
+                User(username=f"user{n:04d}", hashed_password="x", is_active=True)
+                for n in range(users)
+            ]
+            db.add_all(rows)
+            await db.commit()
+            principals = [Principal(id=user.id, username=user.username) for user in rows]
+
+        ids = [principal.id for principal in principals]
+        for round_number in range(rounds):
+            for sender in principals:
+                async with session_factory() as db:
+                    await send_message_to_many(
+                        MessageMulticastCreate(
+                            to_user_ids=[user_id for user_id in ids if user_id != sender.id],
+                            content=f"round {round_number}",
+                        ),
+                        db=db,
+                        current_user=sender,
+                    )
+
+        async with engine.connect() as conn:
+            # VACUUM cannot run inside a transaction block
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("VACUUM ANALYZE notifications"))
+            result = await conn.execute(
+                text(
+                    "SELECT count(*), avg(pg_column_size(n.*)),"
+                    " pg_relation_size('notifications'),"
+                    " pg_total_relation_size('notifications')"
+                    " FROM notifications n"
+                )
+            )
+            count, row_bytes, heap_bytes, total_bytes = result.one()
+
+        reader = principals[0]
+        latencies = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            async with session_factory() as db:
+                page = await get_notifications(
+                    limit=PAGE_SIZE,
+                    cursor=None,
+                    is_read=None,
+                    notification_type=None,
+                    since_seq=None,
+                    db=db,
+                    current_user=reader,
+                )
+            latencies.append(time.perf_counter() - started)
+        assert page.total == PAGE_SIZE
+
+        ordered = sorted(latencies)
+        print(f"notifications: {count} ({users} users, {rounds} rounds)")
+        print(f"avg row bytes: {float(row_bytes):.1f}")
+        print(f"heap bytes:    {heap_bytes}")
+        print(f"total bytes:   {total_bytes} (heap + indexes + toast)")
+        print(f"get_notifications, {PAGE_SIZE} per page, {iterations} iterations:")
+        print(
+            f"  mean {sum(latencies) / len(latencies) * 1000:.3f} ms"
+            f"  p50 {ordered[len(ordered) // 2] * 1000:.3f} ms"
+            f"  p99 {ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000:.3f} ms"
+        )
+
+        async with engine.connect() as conn:
+            await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+            await conn.commit()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(main(*(args + [100, 10, 2000][len(args):])))
@@ -0,0 +1,127 @@
+"""
+Round-trip and latency benchmark for sending messages and read receipts.
+
+Calls the send_message and mark_message_as_read handlers directly against a
+scratch schema on the configured Postgres database, one session per call (as
+get_db does). It counts the SQL statements and transactions each operation
+issues and reports p50 / p99 latency. Round trips are estimated as
+statements + 2 per transaction (asyncpg sends BEGIN and COMMIT separately).
+
+Usage (from backend/):
+    python -m benchmarks.bench_send_pipeline [iterations]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.messages import mark_message_as_read, send_message
+from app.core.config import settings
+from app.models import Base, User
+from app.schemas.message import MessageCreate
+from app.schemas.user import Principal
+
+SCHEMA = "send_bench"
+
+
+class Counter:
+    """Count statements and transactions issued on an engine."""
+
+    def __init__(self, sync_engine):
+        self.statements = 0
+        self.transactions = 0
+        event.listen(sync_engine, "before_cursor_execute", self._on_statement)
+        event.listen(sync_engine, "commit", self._on_transaction)
+        event.listen(sync_engine, "rollback", self._on_transaction)
+
+    def _on_statement(self, *args):
+        self.statements += 1
+
+    def _on_transaction(self, *args):
+        self.transactions += 1
+
+    def snapshot(self) -> tuple[int, int]:
+        return self.statements, self.transactions
+
+
+def _report(name: str, latencies: list[float], statements: int, transactions: int) -> None:
+    n = len(latencies)
+    ordered = sorted(latencies)
+    p50 = ordered[n // 2] * 1000
+    p99 = ordered[min(n - 1, int(n * 0.99))] * 1000
+    round_trips = (statements + 2 * transactions) / n
+    print(
+        f"{name:<22} {round_trips:>11.2f} {statements / n:>10.2f} {transactions / n:>13.2f} "
+        f"{statistics.mean(latencies) * 1000:>9.3f} {p50:>9.3f} {p99:>9.3f}"
+    )
+
+
+async def main(iterations: int) -> None:
+    engine = create_async_engine(
+        settings.DATABASE_URL,
+        connect_args={"server_settings": {"search_path": SCHEMA}},
+    )
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.commit()
+
+        async with session_factory() as db:
+            alice = User(username="alice", hashed_password="x", is_active=True)
+            bob = User(username="bob", hashed_password="x", is_active=True)
+            db.add_all([alice, bob])
+            await db.commit()
+            sender = Principal(id=alice.id, username=alice.username)
+            receiver = Principal(id=bob.id, username=bob.username)
+
+        counter = Counter(engine.sync_engine)
+
+        async def _measure(operation):
+            latencies = []
+            before = counter.snapshot()
+            results = []
+            for i in range(iterations):
+                started = time.perf_counter()
+                async with session_factory() as db:
+                    results.append(await operation(db, i))
+                latencies.append(time.perf_counter() - started)
+            after = counter.snapshot()
+            return results, latencies, after[0] - before[0], after[1] - before[1]
+
+        sent, send_latencies, send_statements, send_transactions = await _measure(
+            lambda db, i: send_message(
+                MessageCreate(to_user_id=receiver.id, content=f"message {i}"),
+                db=db,
+                current_user=sender,
+            )
+        )
+        _, read_latencies, read_statements, read_transactions = await _measure(
+            lambda db, i: mark_message_as_read(sent[i].id, db=db, current_user=receiver)
+        )
+
+        print(f"iterations: {iterations}")
+        print(
+            f"{'operation':<22} {'round trips':>11} {'statements':>10} {'transactions':>13} "
+            f"{'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9}"
+        )
+        _report("send_message", send_latencies, send_statements, send_transactions)
+        _report("mark_message_as_read", read_latencies, read_statements, read_transactions)
+
+        async with engine.connect() as conn:
+            await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+            await conn.commit()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
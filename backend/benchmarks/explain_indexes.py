@@ -0,0 +1,282 @@
+"""
+EXPLAIN ANALYZE benchmark for the message, notification and friendship indexes.
+
+Seeds a scratch schema on the configured Postgres database with a skewed
+dataset (one heavy user who receives a large share of all traffic), then runs
+the hot API queries twice: once with only the original single-column indexes
+and once with the composite / partial indexes declared on the models.
+
+The scratch schema is dropped afterwards unless --keep is given.
+
+Usage (from backend/):
+    python -m benchmarks.explain_indexes [--users 5000] [--messages 1000000]
+"""
+
+import argparse
+import asyncio
+import re
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.models import Base
+
+SCHEMA = "index_bench"
+HEAVY_USER = 1
+
+# (name, SQL); :cursor_at / :cursor_id point at the middle of the heavy user's inbox
+# and {unread_ranges} is one (sender_id, id > watermark) range per unread peer
+QUERIES = [
+    (
+        "inbox first page",
+        """SELECT * FROM messages WHERE receiver_id = :user_id
+           ORDER BY created_at DESC, id DESC LIMIT 51""",
+    ),
+    (
+        "inbox deep page (cursor)",
+        """SELECT * FROM messages WHERE receiver_id = :user_id
+           AND (created_at, id) < (:cursor_at, :cursor_id)
+           ORDER BY created_at DESC, id DESC LIMIT 51""",
+    ),
+    (
+        "inbox unread only",
+        """SELECT * FROM (
+               SELECT * FROM messages WHERE receiver_id = :user_id AND ({unread_ranges})
+               OFFSET 0
+           ) m
+           ORDER BY created_at DESC, id DESC LIMIT 51""",
+    ),
+    (
+        "outbox first page",
+        """SELECT * FROM messages WHERE sender_id = :user_id
+           ORDER BY created_at DESC, id DESC LIMIT 51""",
+    ),
+    (
+        "notifications newest 50",
+        """SELECT * FROM notifications WHERE user_id = :user_id
+           ORDER BY seq DESC LIMIT 51""",
+    ),
+    (
+        "notifications unread page",
+        """SELECT * FROM notifications WHERE user_id = :user_id AND is_read = false
+           ORDER BY seq DESC LIMIT 51""",
+    ),
+    (
+        "notifications unread count",
+        """SELECT count(*) FROM notifications WHERE user_id = :user_id AND is_read = false""",
+    ),
+    (
+        "friend_of lookup",
+        """SELECT user1_id FROM friendships WHERE user2_id = :user_id""",
+    ),
+]
+
+NEW_INDEXES = [
+    "ix_messages_receiver_created",
+    "ix_messages_sender_created",
+    "ix_messages_receiver_sender_id",
+    "uq_notifications_user_seq",
+    "ix_notifications_user_unread",
+    "ix_friendships_user2_user1",
+]
+
+OLD_INDEXES = [
+    "CREATE INDEX idx_messages_receiver ON messages (receiver_id)",
+    "CREATE INDEX idx_messages_sender ON messages (sender_id)",
+    "CREATE INDEX idx_notifications_user ON notifications (user_id)",
+    "CREATE INDEX idx_friendships_user2 ON friendships (user2_id)",
+]
+
+# The inbox reads these first to build its unread ranges
+UNREAD_RANGES = """SELECT c.peer_id, coalesce(rs.last_read_message_id, 0)
+   FROM conversations c
+   LEFT JOIN conversation_read_state rs ON rs.reader_id = c.owner_id AND rs.peer_id = c.peer_id
+   WHERE c.owner_id = :user_id AND c.unread_count > 0"""
+
+TABLES = [
+    "messages",
+    "conversation_read_state",
+    "conversations",
+    "notifications",
+    "friendships",
+]
+
+SEED = [
+    """INSERT INTO users (id, username, hashed_password, is_active, created_at, updated_at)
+       SELECT g, 'user' || g, 'x', true, now(), now() FROM generate_series(1, :users) g""",
+    # A third of all messages go to (and come from) the heavy user; ids follow time
+    """INSERT INTO messages (sender_id, receiver_id, content, created_at, updated_at)
+       SELECT s, r, 'message ' || g, ts, ts
+       FROM (
+           SELECT g,
+                  CASE WHEN g % 3 = 1 THEN :heavy ELSE 2 + (g::bigint * 7919) % (:users - 1) END AS s,
+                  CASE WHEN g % 3 = 0 THEN :heavy ELSE 2 + (g::bigint * 104729) % (:users - 1) END AS r,
+                  now() - ((:messages - g) || ' seconds')::interval AS ts
+           FROM generate_series(1, :messages) g
+       ) m""",
+    # Most conversations are read to the end; one in fifty only up to its median
+    """INSERT INTO conversation_read_state (reader_id, peer_id, last_read_message_id, read_at)
+       SELECT receiver_id, sender_id,
+              CASE WHEN random() < 0.98 THEN max(id)
+                   ELSE percentile_disc(0.5) WITHIN GROUP (ORDER BY id) END,
+              now()
+       FROM messages GROUP BY receiver_id, sender_id""",
+    """INSERT INTO conversations (owner_id, peer_id, last_message_id, last_sender_id,
+                                  last_message_preview, last_message_at, unread_count)
+       SELECT m.owner_id, m.peer_id, max(m.id), (array_agg(m.sender_id ORDER BY m.id DESC))[1],
+              'preview', max(m.created_at),
+              count(*) FILTER (WHERE m.receiver_id = m.owner_id
+                               AND m.id > coalesce(rs.last_read_message_id, 0))
+       FROM (
+           SELECT receiver_id AS owner_id, sender_id AS peer_id, * FROM messages
+           UNION ALL
+           SELECT sender_id, receiver_id, * FROM messages WHERE sender_id <> receiver_id
+       ) m
+       LEFT JOIN conversation_read_state rs
+           ON rs.reader_id = m.owner_id AND rs.peer_id = m.peer_id
+       GROUP BY m.owner_id, m.peer_id""",
+    # A new_message notification per message, unread only for the newest one per
+    # sender in a conversation with unread messages, and a message_read
+    # notification per read message; seq follows time per user
+    """INSERT INTO notifications (user_id, type_code, actor_id, related_id, count, seq, is_read, created_at)
+       SELECT user_id, type_code, actor_id, related_id, 1,
+              row_number() OVER (PARTITION BY user_id ORDER BY created_at, related_id, type_code),
+              is_read, created_at
+       FROM (
+           SELECT m.receiver_id AS user_id, 1 AS type_code, m.sender_id AS actor_id,
+                  m.id AS related_id, m.created_at,
+                  m.id <> max(m.id) OVER (PARTITION BY m.receiver_id, m.sender_id)
+                      OR m.id <= rs.last_read_message_id AS is_read
+           FROM messages m
+           JOIN conversation_read_state rs
+               ON rs.reader_id = m.receiver_id AND rs.peer_id = m.sender_id
+           UNION ALL
+           SELECT m.sender_id, 2, m.receiver_id, m.id, m.created_at, random() < 0.9
+           FROM messages m
+           JOIN conversation_read_state rs
+               ON rs.reader_id = m.receiver_id AND rs.peer_id = m.sender_id
+           WHERE m.id <= rs.last_read_message_id
+       ) n""",
+    """INSERT INTO friendships (user1_id, user2_id)
+       SELECT g, 1 + (g * k) % :users FROM generate_series(1, :users) g, generate_series(1, 50) k
+       WHERE 1 + (g * k) % :users <> g
+       ON CONFLICT DO NOTHING""",
+]
+
+
+def _execution_ms(plan: str) -> float:
+    match = re.search(r"Execution Time: ([\d.]+) ms", plan)
+    return float(match.group(1)) if match else float("nan")
+
+
+async def _vacuum_analyze(engine) -> None:
+    """Refresh statistics and the visibility map so index-only scans are possible."""
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for table in TABLES:
+            await conn.execute(text(f"VACUUM ANALYZE {SCHEMA}.{table}"))
+
+
+async def _explain_all(
+    conn, params: dict, fragments: dict, label: str
+) -> dict[str, float]:
+    timings = {}
+    for name, sql in QUERIES:
+        sql = sql.format(**fragments)
+        # Warm up once so both configurations are measured with a hot cache
+        await conn.execute(text(sql), params)
+        result = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params)
+        plan = "\n".join(row[0] for row in result)
+        timings[name] = _execution_ms(plan)
+        print(f"--- [{label}] {name}\n{plan}\n")
+    return timings
+
+
+async def main(users: int, messages: int, keep: bool) -> None:
+    engine = create_async_engine(settings.DATABASE_URL)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            await conn.commit()
+
+            await conn.run_sync(
+                lambda sync_conn: Base.metadata.create_all(
+                    sync_conn.execution_options(schema_translate_map={None: SCHEMA})
+                )
+            )
+            await conn.execute(text(f"SET search_path TO {SCHEMA}"))
+
+            started = time.perf_counter()
+            seed_params = {"users": users, "messages": messages, "heavy": HEAVY_USER}
+            for statement in SEED:
+                await conn.execute(text(statement), seed_params)
+            await conn.commit()
+            await _vacuum_analyze(engine)
+
+            counts = (
+                await conn.execute(
+                    text(
+                        "SELECT (SELECT count(*) FROM messages), "
+                        "(SELECT count(*) FROM notifications), "
+                        "(SELECT count(*) FROM messages WHERE receiver_id = :u)"
+                    ),
+                    {"u": HEAVY_USER},
+                )
+            ).one()
+            print(
+                f"seeded {users} users, {counts[0]} messages, {counts[1]} notifications "
+                f"({counts[2]} messages to user {HEAVY_USER}) "
+                f"in {time.perf_counter() - started:.1f}s\n"
+            )
+
+            cursor = (
+                await conn.execute(
+                    text(
+                        "SELECT created_at, id FROM messages WHERE receiver_id = :u "
+                        "ORDER BY created_at DESC, id DESC OFFSET :n LIMIT 1"
+                    ),
+                    {"u": HEAVY_USER, "n": counts[2] // 2},
+                )
+            ).one()
+            params = {"user_id": HEAVY_USER, "cursor_at": cursor[0], "cursor_id": cursor[1]}
+            ranges = (await conn.execute(text(UNREAD_RANGES), params)).all()
+            fragments = {
+                "unread_ranges": " OR ".join(
+                    f"(sender_id = {peer_id} AND id > {watermark})"
+                    for peer_id, watermark in ranges
+                )
+            }
+            print(f"user {HEAVY_USER} has {len(ranges)} conversations with unread messages\n")
+
+            composite = await _explain_all(conn, params, fragments, "composite")
+
+            for name in NEW_INDEXES:
+                await conn.execute(text(f"DROP INDEX {name}"))
+            for statement in OLD_INDEXES:
+                await conn.execute(text(statement))
+            await conn.commit()
+            await _vacuum_analyze(engine)
+
+            single = await _explain_all(conn, params, fragments, "single-column")
+
+            print(f"{'query':<30} {'single-column':>15} {'composite':>12}")
+            for name, _ in QUERIES:
+                print(f"{name:<30} {single[name]:>12.3f} ms {composite[name]:>9.3f} ms")
+
+            if not keep:
+                await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+                await conn.commit()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch schema")
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.messages, args.keep))
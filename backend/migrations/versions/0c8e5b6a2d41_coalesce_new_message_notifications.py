@@ -0,0 +1,73 @@
+"""coalesce new_message notifications
+
+Revision ID: 0c8e5b6a2d41
+Revises: f4b7d2e80c15
+Create Date: 2026-10-17 03:05:47.662391
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0c8e5b6a2d41"
+down_revision: Union[str, None] = "f4b7d2e80c15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Merge existing unread new_message notifications per (user, sender) into
+    # the newest one, so the unique index below can be built
+    op.execute(
+        """
+        UPDATE notifications n
+        SET count = g.total, related_id = g.related_id
+        FROM (
+            SELECT user_id, actor_id, max(id) AS keep_id, sum(count) AS total,
+                   max(related_id) AS related_id
+            FROM notifications
+            WHERE is_read = false AND type_code = 1 AND actor_id IS NOT NULL
+            GROUP BY user_id, actor_id
+            HAVING count(*) > 1
+        ) g
+        WHERE n.id = g.keep_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM notifications n
+        WHERE n.is_read = false AND n.type_code = 1 AND n.actor_id IS NOT NULL
+          AND n.id < (
+            SELECT max(m.id) FROM notifications m
+            WHERE m.user_id = n.user_id AND m.actor_id = n.actor_id
+              AND m.is_read = false AND m.type_code = 1
+          )
+        """
+    )
+    # The merged rows no longer count towards the badge
+    op.execute(
+        """
+        UPDATE user_counters c
+        SET unread_notifications = (
+            SELECT count(*) FROM notifications n
+            WHERE n.user_id = c.user_id AND n.is_read = false
+        )
+        """
+    )
+    # One unread new_message notification per sender; sends upsert it
+    op.create_index(
+        "uq_notifications_unread_new_message",
+        "notifications",
+        ["user_id", "actor_id"],
+        unique=True,
+        postgresql_where=sa.text("is_read = false AND type_code = 1"),
+    )
+
+
+def downgrade() -> None:
+    # Merged notifications keep their count
+    op.drop_index("uq_notifications_unread_new_message", table_name="notifications")
@@ -0,0 +1,76 @@
+"""add notification seq
+
+Revision ID: 3b9e6f0d2a17
+Revises: 7d3f9a1c5e28
+Create Date: 2026-10-17 10:26:03.917254
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3b9e6f0d2a17"
+down_revision: Union[str, None] = "7d3f9a1c5e28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Coalescing keeps the id and moves the notification to a new seq; the
+    # feed and streams order by seq. Existing rows take their id, so resume
+    # positions handed out before this migration stay valid.
+    op.add_column("notifications", sa.Column("seq", sa.Integer(), nullable=True))
+    op.execute("UPDATE notifications SET seq = id")
+    op.alter_column("notifications", "seq", nullable=False)
+
+    # Seqs are handed out per user from user_counters
+    op.add_column(
+        "user_counters",
+        sa.Column("notification_seq", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.execute(
+        """
+        INSERT INTO user_counters (user_id, notification_seq)
+        SELECT user_id, max(seq)
+        FROM notifications
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE
+        SET notification_seq = excluded.notification_seq
+        """
+    )
+
+    op.drop_index("ix_notifications_user_id", table_name="notifications")
+    op.create_index(
+        "uq_notifications_user_seq",
+        "notifications",
+        ["user_id", sa.text("seq DESC")],
+        unique=True,
+    )
+    op.drop_index("ix_notifications_user_unread", table_name="notifications")
+    op.create_index(
+        "ix_notifications_user_unread",
+        "notifications",
+        ["user_id", sa.text("seq DESC")],
+        postgresql_where=sa.text("is_read = false"),
+    )
+
+
+def downgrade() -> None:
+    # Coalesced notifications keep their (older) id and so sort lower
+    op.drop_index("ix_notifications_user_unread", table_name="notifications")
+    op.create_index(
+        "ix_notifications_user_unread",
+        "notifications",
+        ["user_id", sa.text("id DESC")],
+        postgresql_where=sa.text("is_read = false"),
+    )
+    op.drop_index("uq_notifications_user_seq", table_name="notifications")
+    op.create_index(
+        "ix_notifications_user_id", "notifications", ["user_id", sa.text("id DESC")]
+    )
+    op.drop_column("user_counters", "notification_seq")
+    op.drop_column("notifications", "seq")
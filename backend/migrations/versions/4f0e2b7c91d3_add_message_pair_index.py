@@ -0,0 +1,37 @@
+"""add message pair index
+
+Revision ID: 4f0e2b7c91d3
+Revises: bccef385dca9
+Create Date: 2026-10-16 22:41:08.774512
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4f0e2b7c91d3"
+down_revision: Union[str, None] = "bccef385dca9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Conversation history: the unordered pair, then newest first
+    op.create_index(
+        "ix_messages_pair_created",
+        "messages",
+        [
+            sa.text("least(sender_id, receiver_id)"),
+            sa.text("greatest(sender_id, receiver_id)"),
+            sa.text("created_at DESC"),
+            sa.text("id DESC"),
+        ],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_messages_pair_created", table_name="messages")
@@ -0,0 +1,27 @@
+"""add notification stream index
+
+Revision ID: 6b3e8f12a4c9
+Revises: d5c1a9e47b20
+Create Date: 2026-10-17 00:12:45.902117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6b3e8f12a4c9"
+down_revision: Union[str, None] = "d5c1a9e47b20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SSE resume: user_id = ? AND id > Last-Event-ID ORDER BY id
+    op.create_index("ix_notifications_user_id", "notifications", ["user_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notifications_user_id", table_name="notifications")
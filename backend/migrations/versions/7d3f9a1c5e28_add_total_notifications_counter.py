@@ -0,0 +1,44 @@
+"""add total notifications counter
+
+Revision ID: 7d3f9a1c5e28
+Revises: 0c8e5b6a2d41
+Create Date: 2026-10-17 09:12:31.504817
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7d3f9a1c5e28"
+down_revision: Union[str, None] = "0c8e5b6a2d41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Every stored notification, read or not; compaction reads it to find
+    # users over the history cap
+    op.add_column(
+        "user_counters",
+        sa.Column("total_notifications", sa.Integer(), server_default="0", nullable=False),
+    )
+
+    # Backfill: the same recount app.core.counters.reconcile_counters performs
+    op.execute(
+        """
+        INSERT INTO user_counters (user_id, unread_notifications, total_notifications)
+        SELECT user_id, count(*) FILTER (WHERE NOT is_read), count(*)
+        FROM notifications
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE
+        SET total_notifications = excluded.total_notifications
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("user_counters", "total_notifications")
@@ -0,0 +1,81 @@
+"""add composite feed indexes
+
+Revision ID: 968da60fb88e
+Revises: 52be99c22000
+Create Date: 2026-10-16 21:05:12.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "968da60fb88e"
+down_revision: Union[str, None] = "52be99c22000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Inbox / outbox: equality on one party, then ORDER BY created_at DESC, id DESC
+    op.create_index(
+        "ix_messages_receiver_created",
+        "messages",
+        ["receiver_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    op.create_index(
+        "ix_messages_sender_created",
+        "messages",
+        ["sender_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    op.create_index(
+        "ix_messages_receiver_unread",
+        "messages",
+        ["receiver_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        postgresql_where=sa.text("is_read = false"),
+    )
+
+    # Notification feed and unread badge
+    op.create_index(
+        "ix_notifications_user_created",
+        "notifications",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    op.create_index(
+        "ix_notifications_user_unread",
+        "notifications",
+        ["user_id", sa.text("created_at DESC")],
+        postgresql_where=sa.text("is_read = false"),
+    )
+
+    # Reverse friendship lookups; the primary key already leads with user1_id
+    op.create_index(
+        "ix_friendships_user2_user1", "friendships", ["user2_id", "user1_id"]
+    )
+
+    # Superseded by the composites above, which share their leading column
+    op.drop_index("idx_messages_receiver", table_name="messages")
+    op.drop_index("idx_messages_sender", table_name="messages")
+    op.drop_index("idx_notifications_user", table_name="notifications")
+    op.drop_index("idx_friendships_user1", table_name="friendships")
+    op.drop_index("idx_friendships_user2", table_name="friendships")
+
+
+def downgrade() -> None:
+    op.create_index("idx_friendships_user2", "friendships", ["user2_id"], unique=False)
+    op.create_index("idx_friendships_user1", "friendships", ["user1_id"], unique=False)
+    op.create_index(
+        "idx_notifications_user", "notifications", ["user_id"], unique=False
+    )
+    op.create_index("idx_messages_sender", "messages", ["sender_id"], unique=False)
+    op.create_index("idx_messages_receiver", "messages", ["receiver_id"], unique=False)
+
+    op.drop_index("ix_friendships_user2_user1", table_name="friendships")
+    op.drop_index("ix_notifications_user_unread", table_name="notifications")
+    op.drop_index("ix_notifications_user_created", table_name="notifications")
+    op.drop_index("ix_messages_receiver_unread", table_name="messages")
+    op.drop_index("ix_messages_sender_created", table_name="messages")
+    op.drop_index("ix_messages_receiver_created", table_name="messages")
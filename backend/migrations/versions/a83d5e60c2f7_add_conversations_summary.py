@@ -0,0 +1,94 @@
+"""add conversations summary
+
+Revision ID: a83d5e60c2f7
+Revises: 4f0e2b7c91d3
+Create Date: 2026-10-16 23:02:19.140853
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a83d5e60c2f7"
+down_revision: Union[str, None] = "4f0e2b7c91d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "conversations",
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("peer_id", sa.Integer(), nullable=False),
+        sa.Column("last_message_id", sa.Integer(), nullable=False),
+        sa.Column("last_sender_id", sa.Integer(), nullable=False),
+        sa.Column("last_message_preview", sa.String(), nullable=False),
+        sa.Column("last_message_at", sa.DateTime(), nullable=False),
+        sa.Column("unread_count", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["owner_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["peer_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("owner_id", "peer_id"),
+    )
+    # Conversation list: most recent first
+    op.create_index(
+        "ix_conversations_owner_recent",
+        "conversations",
+        ["owner_id", sa.text("last_message_at DESC"), sa.text("peer_id DESC")],
+    )
+    # Unread recount after a read: the rows above the reader's watermark
+    op.create_index(
+        "ix_messages_receiver_sender_id",
+        "messages",
+        ["receiver_id", "sender_id", "id"],
+    )
+
+    # Backfill: one row per participant and peer, from the newest message between them
+    op.execute(
+        """
+        WITH sides AS (
+            SELECT sender_id AS owner_id, receiver_id AS peer_id, id FROM messages
+            UNION ALL
+            SELECT receiver_id, sender_id, id FROM messages WHERE sender_id <> receiver_id
+        ),
+        latest AS (
+            SELECT owner_id, peer_id, max(id) AS message_id FROM sides GROUP BY owner_id, peer_id
+        )
+        INSERT INTO conversations (
+            owner_id, peer_id, last_message_id, last_sender_id,
+            last_message_preview, last_message_at, unread_count
+        )
+        SELECT
+            l.owner_id,
+            l.peer_id,
+            m.id,
+            m.sender_id,
+            left(m.content, 140),
+            coalesce(m.created_at, now()),
+            (
+                SELECT count(*)
+                FROM messages u
+                WHERE u.receiver_id = l.owner_id
+                  AND u.sender_id = l.peer_id
+                  AND u.id > coalesce(
+                      (
+                          SELECT s.last_read_message_id
+                          FROM conversation_read_state s
+                          WHERE s.reader_id = l.owner_id AND s.peer_id = l.peer_id
+                      ),
+                      0
+                  )
+            )
+        FROM latest l
+        JOIN messages m ON m.id = l.message_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_messages_receiver_sender_id", table_name="messages")
+    op.drop_index("ix_conversations_owner_recent", table_name="conversations")
+    op.drop_table("conversations")
@@ -0,0 +1,68 @@
+"""add conversation read state
+
+Revision ID: bccef385dca9
+Revises: 968da60fb88e
+Create Date: 2026-10-16 22:14:41.506327
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "bccef385dca9"
+down_revision: Union[str, None] = "968da60fb88e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # One read watermark per (reader, peer) instead of a flag on every message
+    op.create_table(
+        "conversation_read_state",
+        sa.Column("reader_id", sa.Integer(), nullable=False),
+        sa.Column("peer_id", sa.Integer(), nullable=False),
+        sa.Column("last_read_message_id", sa.Integer(), nullable=False),
+        sa.Column("read_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["reader_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["peer_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("reader_id", "peer_id"),
+    )
+
+    # Backfill: each conversation is read up to its newest message marked read
+    op.execute(
+        """
+        INSERT INTO conversation_read_state (reader_id, peer_id, last_read_message_id, read_at)
+        SELECT receiver_id, sender_id, max(id), coalesce(max(read_at), now())
+        FROM messages
+        WHERE is_read
+        GROUP BY receiver_id, sender_id
+        """
+    )
+
+    # is_read is no longer maintained, so the partial index would cover every row
+    op.drop_index("ix_messages_receiver_unread", table_name="messages")
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        UPDATE messages AS m
+        SET is_read = true, read_at = coalesce(m.read_at, s.read_at)
+        FROM conversation_read_state AS s
+        WHERE s.reader_id = m.receiver_id
+          AND s.peer_id = m.sender_id
+          AND m.id <= s.last_read_message_id
+          AND NOT m.is_read
+        """
+    )
+    op.create_index(
+        "ix_messages_receiver_unread",
+        "messages",
+        ["receiver_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        postgresql_where=sa.text("is_read = false"),
+    )
+    op.drop_table("conversation_read_state")
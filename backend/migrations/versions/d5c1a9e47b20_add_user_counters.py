@@ -0,0 +1,57 @@
+"""add user counters
+
+Revision ID: d5c1a9e47b20
+Revises: a83d5e60c2f7
+Create Date: 2026-10-16 23:41:07.318264
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d5c1a9e47b20"
+down_revision: Union[str, None] = "a83d5e60c2f7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_counters",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("unread_messages", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("unread_notifications", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+    # Backfill: the same recount app.core.counters.reconcile_counters performs
+    op.execute(
+        """
+        INSERT INTO user_counters (user_id, unread_messages, unread_notifications)
+        SELECT
+            u.id,
+            coalesce(
+                (
+                    SELECT sum(c.unread_count)
+                    FROM conversations c
+                    WHERE c.owner_id = u.id
+                ),
+                0
+            ),
+            (
+                SELECT count(*)
+                FROM notifications n
+                WHERE n.user_id = u.id AND NOT n.is_read
+            )
+        FROM users u
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_counters")
@@ -0,0 +1,54 @@
+"""index notifications by id
+
+Revision ID: e2a7c4d91f36
+Revises: 6b3e8f12a4c9
+Create Date: 2026-10-17 00:58:31.470652
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a7c4d91f36"
+down_revision: Union[str, None] = "6b3e8f12a4c9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The feed now pages by id (ids follow insertion order), newest first
+    op.drop_index("ix_notifications_user_id", table_name="notifications")
+    op.create_index(
+        "ix_notifications_user_id", "notifications", ["user_id", sa.text("id DESC")]
+    )
+    # Latest unread: one scan of the partial index, already in feed order
+    op.drop_index("ix_notifications_user_unread", table_name="notifications")
+    op.create_index(
+        "ix_notifications_user_unread",
+        "notifications",
+        ["user_id", sa.text("id DESC")],
+        postgresql_where=sa.text("is_read = false"),
+    )
+    # Nothing sorts notifications by created_at any more
+    op.drop_index("ix_notifications_user_created", table_name="notifications")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_notifications_user_created",
+        "notifications",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    op.drop_index("ix_notifications_user_unread", table_name="notifications")
+    op.create_index(
+        "ix_notifications_user_unread",
+        "notifications",
+        ["user_id", sa.text("created_at DESC")],
+        postgresql_where=sa.text("is_read = false"),
+    )
+    op.drop_index("ix_notifications_user_id", table_name="notifications")
+    op.create_index("ix_notifications_user_id", "notifications", ["user_id", "id"])
@@ -0,0 +1,121 @@
+"""compact notifications
+
+Revision ID: f4b7d2e80c15
+Revises: e2a7c4d91f36
+Create Date: 2026-10-17 01:42:10.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f4b7d2e80c15"
+down_revision: Union[str, None] = "e2a7c4d91f36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Title and message are rendered from templates at read time
+    # (app.core.notifications); rows keep a type code, the actor and a count
+    op.add_column("notifications", sa.Column("type_code", sa.SmallInteger(), nullable=True))
+    op.add_column("notifications", sa.Column("actor_id", sa.Integer(), nullable=True))
+    op.add_column(
+        "notifications",
+        sa.Column("count", sa.Integer(), server_default="1", nullable=False),
+    )
+
+    # Type codes match app.core.notifications; the app never wrote other types
+    op.execute(
+        """
+        UPDATE notifications SET type_code = CASE notification_type
+            WHEN 'new_message' THEN 1
+            WHEN 'message_read' THEN 2
+            WHEN 'friend_request' THEN 3
+        END
+        """
+    )
+    op.execute("DELETE FROM notifications WHERE type_code IS NULL")
+    # The actor is the sender of a new message and the receiver of a read one
+    op.execute(
+        """
+        UPDATE notifications n
+        SET actor_id = CASE n.type_code WHEN 1 THEN m.sender_id ELSE m.receiver_id END
+        FROM messages m
+        WHERE m.id = n.related_id AND n.type_code IN (1, 2)
+        """
+    )
+    op.execute(
+        """
+        UPDATE notifications n SET actor_id = u.id
+        FROM users u
+        WHERE u.id = n.related_id AND n.type_code = 3
+        """
+    )
+    # Aggregated read receipts stored their size in the text
+    op.execute(
+        """
+        UPDATE notifications
+        SET count = substring(message FROM ' read ([0-9]+) of your messages')::integer
+        WHERE type_code = 2 AND message ~ ' read [0-9]+ of your messages'
+        """
+    )
+
+    op.alter_column("notifications", "type_code", nullable=False)
+    op.create_foreign_key(
+        "notifications_actor_id_fkey",
+        "notifications",
+        "users",
+        ["actor_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    op.drop_column("notifications", "message")
+    op.drop_column("notifications", "title")
+    op.drop_column("notifications", "notification_type")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "notifications",
+        sa.Column("notification_type", sa.String(length=100), nullable=True),
+    )
+    op.add_column("notifications", sa.Column("title", sa.String(length=255), nullable=True))
+    op.add_column("notifications", sa.Column("message", sa.Text(), nullable=True))
+    op.execute(
+        """
+        UPDATE notifications n SET
+            notification_type = CASE n.type_code
+                WHEN 1 THEN 'new_message'
+                WHEN 2 THEN 'message_read'
+                ELSE 'friend_request'
+            END,
+            title = CASE
+                WHEN n.type_code = 1 AND n.count = 1 THEN 'New Message'
+                WHEN n.type_code = 1 THEN 'New Messages'
+                WHEN n.type_code = 2 AND n.count = 1 THEN 'Message Read'
+                WHEN n.type_code = 2 THEN 'Messages Read'
+                ELSE 'Friend Request'
+            END,
+            message = coalesce(u.username, 'Someone') || CASE
+                WHEN n.type_code = 1 AND n.count = 1 THEN ' sent you a message'
+                WHEN n.type_code = 1 THEN ' sent you ' || n.count || ' messages'
+                WHEN n.type_code = 2 AND n.count = 1 THEN ' read your message'
+                WHEN n.type_code = 2 THEN ' read ' || n.count || ' of your messages'
+                ELSE ' sent you a friend request'
+            END
+        FROM notifications n2
+        LEFT JOIN users u ON u.id = n2.actor_id
+        WHERE n2.id = n.id
+        """
+    )
+    op.alter_column("notifications", "notification_type", nullable=False)
+    op.alter_column("notifications", "title", nullable=False)
+    op.drop_constraint("notifications_actor_id_fkey", "notifications", type_="foreignkey")
+    op.drop_column("notifications", "count")
+    op.drop_column("notifications", "actor_id")
+    op.drop_column("notifications", "type_code")
@@ -2,14 +2,21 @@
 Test configuration and fixtures for Awkward Turtle API.
 """
 
+import asyncio
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
+from app.core.conversations import record_messages, refresh_unread_counts
+from app.core.counters import next_notification_seqs
+from app.core.notifications import TYPE_CODES
+from app.core.presence import presence
+from app.core.security import token_cache, user_cache
 from app.db.database import get_db
-from app.models import Base, User, Message, Notification
+from app.models import Base, ConversationReadState, User, Message, Notification
 
 # Use SQLite for testing
 SYNC_TEST_DB_URL = "sqlite:///./test_awkward_turtle_sync.db"
@@ -33,9 +40,9 @@ class AsyncMockSession:
     def __init__(self, sync_session):
         self._session = sync_session
 
-    async def execute(self, statement):
+    async def execute(self, statement, params=None):
         """Wrap execute to be async-compatible."""
-        result = self._session.execute(statement)
+        result = self._session.execute(statement, params)
         return AsyncMockResult(result)
 
     async def commit(self):
@@ -85,19 +92,50 @@ class AsyncMockResult:
         """Return scalars."""
         return self._result.scalars()
 
+    def one_or_none(self):
+        """Return one_or_none."""
+        return self._result.one_or_none()
+
     def all(self):
         """Return all results."""
         return self._result.all()
 
+    @property
+    def rowcount(self):
+        """Return the number of rows matched."""
+        return self._result.rowcount
+
+
+class FakeClock:
+    """Manually advanced clock for expiry tests."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Provide a clock that only moves when a test advances clock.now."""
+    return FakeClock()
+
 
 @pytest.fixture(scope="function")
 def test_db():
     """Create a fresh database for each test."""
     # Create all tables
     Base.metadata.create_all(bind=sync_test_engine)
+    user_cache.clear()
+    token_cache.clear()
+    presence.clear()
     yield
     # Drop all tables after tests
     Base.metadata.drop_all(bind=sync_test_engine)
+    user_cache.clear()
+    token_cache.clear()
+    presence.clear()
 
 
 @pytest.fixture
@@ -164,18 +202,32 @@ def get_auth_token():
 def _create_message_sync(
     sender_id: int, receiver_id: int, content: str, is_read: bool = False
 ):
-    """Create a message using a synchronous session."""
+    """Create a message using a synchronous session.
+
+    Both participants' conversation summaries are kept current, and
+    is_read=True moves the receiver's read watermark up to this message.
+    """
     session = SyncTestingSessionLocal()
     try:
-        message = Message(
-            sender_id=sender_id,
-            receiver_id=receiver_id,
-            content=content,
-            is_read=is_read,
-        )
+        message = Message(sender_id=sender_id, receiver_id=receiver_id, content=content)
         session.add(message)
         session.commit()
         session.refresh(message)
+        asyncio.run(record_messages(AsyncMockSession(session), [message]))
+        session.commit()
+        if is_read:
+            session.merge(
+                ConversationReadState(
+                    reader_id=receiver_id,
+                    peer_id=sender_id,
+                    last_read_message_id=message.id,
+                )
+            )
+            asyncio.run(
+                refresh_unread_counts(AsyncMockSession(session), receiver_id, [sender_id])
+            )
+            session.commit()
+        session.refresh(message)
         return message
     finally:
         session.close()
@@ -184,21 +236,23 @@ def _create_message_sync(
 def _create_notification_sync(
     user_id: int,
     notification_type: str,
-    title: str,
-    message: str = None,
+    actor_id: int = None,
     related_id: int = None,
     is_read: bool = False,
+    count: int = 1,
 ):
     """Create a notification using a synchronous session."""
     session = SyncTestingSessionLocal()
     try:
+        seqs = asyncio.run(next_notification_seqs(AsyncMockSession(session), [user_id]))
         notification = Notification(
             user_id=user_id,
-            notification_type=notification_type,
-            title=title,
-            message=message,
+            type_code=TYPE_CODES[notification_type],
+            actor_id=actor_id,
             related_id=related_id,
+            seq=seqs[user_id],
             is_read=is_read,
+            count=count,
         )
         session.add(notification)
         session.commit()
@@ -0,0 +1,152 @@
+"""
+Tests for notification history compaction.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.core.compaction import NotificationCompactor
+from app.core.counters import reconcile_counters
+from app.models import Notification, UserCounters
+
+from tests.conftest import (
+    AsyncMockSession,
+    SyncTestingSessionLocal,
+    _create_notification_sync,
+)
+
+
+def _run(coroutine_function):
+    session = AsyncMockSession(SyncTestingSessionLocal())
+    try:
+        return asyncio.run(coroutine_function(session))
+    finally:
+        asyncio.run(session.close())
+
+
+def _notify(user_id, count, is_read=False, age_days=0):
+    ids = [
+        _create_notification_sync(user_id, "new_message", is_read=is_read).id
+        for _ in range(count)
+    ]
+    if age_days:
+        session = SyncTestingSessionLocal()
+        try:
+            session.execute(
+                update(Notification)
+                .where(Notification.id.in_(ids))
+                .values(created_at=datetime.utcnow() - timedelta(days=age_days))
+            )
+            session.commit()
+        finally:
+            session.close()
+    return ids
+
+
+def _remaining(user_id):
+    session = SyncTestingSessionLocal()
+    try:
+        return [
+            n.id
+            for n in session.query(Notification)
+            .filter(Notification.user_id == user_id)
+            .order_by(Notification.id)
+        ]
+    finally:
+        session.close()
+
+
+def _counters(user_id):
+    session = SyncTestingSessionLocal()
+    try:
+        counters = session.get(UserCounters, user_id)
+        return counters.unread_notifications, counters.total_notifications
+    finally:
+        session.close()
+
+
+class TestNotificationCompactor:
+    """Tests for the batched history compaction."""
+
+    def test_keeps_only_the_newest_per_user(self, test_db, create_test_user):
+        """Test that each user is trimmed to the cap, oldest rows first."""
+        alice = create_test_user("alice", "password123")
+        bob = create_test_user("bob", "password123")
+        alice_ids = _notify(alice.id, 7)
+        bob_ids = _notify(bob.id, 2)
+        _run(reconcile_counters)
+        compactor = NotificationCompactor(max_per_user=3, max_age_days=0, batch_size=2)
+
+        report = _run(compactor.run)
+
+        assert report["removed_by_cap"] == 4
+        assert report["removed_by_age"] == 0
+        assert _remaining(alice.id) == alice_ids[-3:]
+        assert _remaining(bob.id) == bob_ids
+        assert _counters(alice.id) == (3, 3)
+        assert compactor.stats() == report
+
+    def test_users_under_their_counted_total_are_skipped(self, test_db, create_test_user):
+        """Test that candidates come from the counters, not a table scan."""
+        alice = create_test_user("alice", "password123")
+        _notify(alice.id, 2)
+        _run(reconcile_counters)
+        _notify(alice.id, 3)
+        compactor = NotificationCompactor(max_per_user=3, max_age_days=0, batch_size=10)
+
+        assert _run(compactor.run)["removed_by_cap"] == 0
+
+        _run(reconcile_counters)
+
+        assert _run(compactor.run)["removed_by_cap"] == 2
+
+    def test_removes_notifications_past_the_age_limit(self, test_db, create_test_user):
+        """Test that expired rows are removed across batches and newer ones kept."""
+        alice = create_test_user("alice", "password123")
+        _notify(alice.id, 5, age_days=40)
+        recent = _notify(alice.id, 2)
+        compactor = NotificationCompactor(max_per_user=0, max_age_days=30, batch_size=2)
+
+        report = _run(compactor.run)
+
+        assert report["removed_by_age"] == 5
+        assert _remaining(alice.id) == recent
+
+    def test_refreshed_rows_do_not_stop_the_age_walk(self, test_db, create_test_user):
+        """Test that a coalesced (low id, recent) row does not shield older rows."""
+        alice = create_test_user("alice", "password123")
+        _notify(alice.id, 2, age_days=40)
+        refreshed = _notify(alice.id, 1)
+        _notify(alice.id, 2, age_days=40)
+        compactor = NotificationCompactor(max_per_user=0, max_age_days=30, batch_size=2)
+
+        report = _run(compactor.run)
+
+        assert report["removed_by_age"] == 4
+        assert _remaining(alice.id) == refreshed
+
+    def test_a_batch_of_fresh_rows_does_not_end_the_age_walk(self, test_db, create_test_user):
+        """Test that aged rows behind a full batch of refreshed low-id rows are removed."""
+        alice = create_test_user("alice", "password123")
+        refreshed = _notify(alice.id, 5)
+        _notify(alice.id, 5, age_days=200)
+        compactor = NotificationCompactor(max_per_user=0, max_age_days=30, batch_size=5)
+
+        report = _run(compactor.run)
+
+        assert report["removed_by_age"] == 5
+        assert _remaining(alice.id) == refreshed
+
+    def test_counters_follow_removed_rows(self, test_db, create_test_user):
+        """Test that removing notifications lowers the unread and total counters."""
+        alice = create_test_user("alice", "password123")
+        _notify(alice.id, 3)
+        _notify(alice.id, 2, is_read=True)
+        _run(lambda db: reconcile_counters(db, [alice.id]))
+        compactor = NotificationCompactor(max_per_user=1, max_age_days=0, batch_size=10)
+
+        _run(compactor.run)
+
+        assert _counters(alice.id) == (0, 1)
@@ -0,0 +1,135 @@
+"""
+Tests for the conversation list and the summaries behind it.
+"""
+
+from app.core.conversations import PREVIEW_LENGTH
+
+
+def _send(client, token, to_user_id, content):
+    client.cookies.set("access_token", token)
+    response = client.post(
+        "/api/v1/messages/send", json={"to_user_id": to_user_id, "content": content}
+    )
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def _conversations(client, token, **params):
+    client.cookies.set("access_token", token)
+    response = client.get("/api/v1/conversations", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestConversationList:
+    """Tests for GET /api/v1/conversations."""
+
+    def test_send_updates_both_participants(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that each side sees the last message; only the receiver has unread."""
+        alice = create_test_user("alice", "password123")
+        bob = create_test_user("bob", "password123")
+        alice_token, bob_token = get_auth_token("alice"), get_auth_token("bob")
+
+        _send(client, alice_token, bob.id, "Hi Bob")
+        last_id = _send(client, alice_token, bob.id, "x" * 500)
+
+        [for_alice] = _conversations(client, alice_token)["conversations"]
+        [for_bob] = _conversations(client, bob_token)["conversations"]
+
+        assert for_alice["peer_id"] == bob.id
+        assert for_alice["peer_username"] == "bob"
+        assert for_alice["unread_count"] == 0
+        assert for_bob["peer_id"] == alice.id
+        assert for_bob["unread_count"] == 2
+        assert for_bob["last_message_id"] == last_id
+        assert for_bob["last_sender_id"] == alice.id
+        assert for_bob["last_message_preview"] == "x" * PREVIEW_LENGTH
+
+    def test_reads_update_unread_count(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that single and batch reads bring the unread count down."""
+        alice = create_test_user("alice", "password123")
+        bob = create_test_user("bob", "password123")
+        alice_token, bob_token = get_auth_token("alice"), get_auth_token("bob")
+        ids = [_send(client, alice_token, bob.id, f"Message {i}") for i in range(3)]
+
+        client.cookies.set("access_token", bob_token)
+        client.post(f"/api/v1/messages/{ids[0]}/read")
+        [for_bob] = _conversations(client, bob_token)["conversations"]
+        assert for_bob["unread_count"] == 2
+
+        client.cookies.set("access_token", bob_token)
+        client.post(
+            "/api/v1/messages/read", json={"sender_id": alice.id, "up_to_id": ids[-1]}
+        )
+        [for_bob] = _conversations(client, bob_token)["conversations"]
+        assert for_bob["unread_count"] == 0
+
+    def test_unread_count_uses_each_peers_watermark(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that a read recounts against that peer's watermark, not another's."""
+        alice = create_test_user("alice", "password123")
+        bob = create_test_user("bob", "password123")
+        create_test_user("carol", "password123")
+        bob_token = get_auth_token("bob")
+        from_carol = _send(client, get_auth_token("carol"), bob.id, "Hi from Carol")
+        client.cookies.set("access_token", bob_token)
+        client.post(f"/api/v1/messages/{from_carol}/read")
+        ids = [_send(client, get_auth_token("alice"), bob.id, f"Message {i}") for i in range(3)]
+
+        client.cookies.set("access_token", bob_token)
+        client.post(f"/api/v1/messages/{ids[0]}/read")
+
+        by_peer = {
+            c["peer_id"]: c["unread_count"]
+            for c in _conversations(client, bob_token)["conversations"]
+        }
+        assert by_peer[alice.id] == 2
+
+    def test_ordered_by_recency_with_cursor(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that the most recently active conversation comes first."""
+        me = create_test_user("me", "password123")
+        peers = [create_test_user(f"peer{i}", "password123") for i in range(3)]
+        token = get_auth_token("me")
+        for peer in peers:
+            _send(client, token, peer.id, f"Hello {peer.username}")
+        _send(client, get_auth_token("peer0"), me.id, "Back at you")
+
+        first = _conversations(client, token, limit=2)
+        second = _conversations(client, token, limit=2, cursor=first["next_cursor"])
+
+        assert [c["peer_username"] for c in first["conversations"]] == ["peer0", "peer2"]
+        assert [c["peer_username"] for c in second["conversations"]] == ["peer1"]
+        assert second["next_cursor"] is None
+
+    def test_send_many_updates_each_recipient(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that a multicast send creates a summary per recipient."""
+        create_test_user("me", "password123")
+        alice = create_test_user("alice", "password123")
+        bob = create_test_user("bob", "password123")
+        client.cookies.set("access_token", get_auth_token("me"))
+
+        client.post(
+            "/api/v1/messages/send-many",
+            json={"to_user_ids": [alice.id, bob.id], "content": "Party at mine"},
+        )
+
+        mine = _conversations(client, get_auth_token("me"))["conversations"]
+        [for_alice] = _conversations(client, get_auth_token("alice"))["conversations"]
+        assert {c["peer_id"] for c in mine} == {alice.id, bob.id}
+        assert for_alice["last_message_preview"] == "Party at mine"
+        assert for_alice["unread_count"] == 1
+
+    def test_unauthenticated(self, client, test_db, override_get_db):
+        """Test that the list requires authentication."""
+        response = client.get("/api/v1/conversations")
+
+        assert response.status_code == 401
@@ -0,0 +1,192 @@
+"""
+Tests for unread counters and the counts endpoint.
+"""
+
+import asyncio
+
+from sqlalchemy import update
+
+from app.core.counters import reconcile_counters
+from app.models import UserCounters
+
+from tests.conftest import (
+    AsyncMockSession,
+    SyncTestingSessionLocal,
+    _create_notification_sync,
+)
+
+
+def _counts(client, token):
+    client.cookies.set("access_token", token)
+    response = client.get("/api/v1/counts")
+    assert response.status_code == 200
+    return response.json()
+
+
+def _send(client, token, to_user_id, content="Hello"):
+    client.cookies.set("access_token", token)
+    response = client.post(
+        "/api/v1/messages/send", json={"to_user_id": to_user_id, "content": content}
+    )
+    return response.json()["id"]
+
+
+def _total_notifications(user_id):
+    session = SyncTestingSessionLocal()
+    try:
+        return session.get(UserCounters, user_id).total_notifications
+    finally:
+        session.close()
+
+
+def _reconcile(user_ids=None):
+    session = AsyncMockSession(SyncTestingSessionLocal())
+    try:
+        return asyncio.run(reconcile_counters(session, user_ids))
+    finally:
+        asyncio.run(session.close())
+
+
+class TestCountsEndpoint:
+    """Tests for GET /api/v1/counts."""
+
+    def test_counts_default_to_zero(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that a user with no activity has zero counts."""
+        create_test_user("alice", "password123")
+
+        assert _counts(client, get_auth_token("alice")) == {
+            "unread_messages": 0,
+            "unread_notifications": 0,
+        }
+
+    def test_sends_and_reads_move_counters(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that sends increment and reads decrement the receiver's counts."""
+        alice = create_test_user("alice", "password123")
+        bob = create_test_user("bob", "password123")
+        alice_token, bob_token = get_auth_token("alice"), get_auth_token("bob")
+        ids = [_send(client, alice_token, bob.id, f"Message {i}") for i in range(3)]
+
+        # The three sends share one coalesced notification
+        assert _counts(client, bob_token) == {
+            "unread_messages": 3,
+            "unread_notifications": 1,
+        }
+
+        client.cookies.set("access_token", bob_token)
+        client.post(f"/api/v1/messages/{ids[1]}/read")
+
+        assert _counts(client, bob_token)["unread_messages"] == 1
+        assert _counts(client, alice_token)["unread_notifications"] == 1
+
+        client.cookies.set("access_token", bob_token)
+        client.post("/api/v1/messages/read", json={"sender_id": alice.id, "up_to_id": ids[2]})
+
+        assert _counts(client, bob_token)["unread_messages"] == 0
+        assert _counts(client, alice_token)["unread_notifications"] == 2
+
+    def test_notification_read_and_delete_move_counter(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that reading (once) and deleting notifications lower the counter."""
+        create_test_user("alice", "password123")
+        create_test_user("carol", "password123")
+        bob = create_test_user("bob", "password123")
+        bob_token = get_auth_token("bob")
+        _send(client, get_auth_token("alice"), bob.id)
+        _send(client, get_auth_token("carol"), bob.id)
+        client.cookies.set("access_token", bob_token)
+        notification_id = client.get("/api/v1/notifications").json()["notifications"][0]["id"]
+
+        client.post(f"/api/v1/notifications/{notification_id}/read")
+        client.post(f"/api/v1/notifications/{notification_id}/read")
+
+        assert _counts(client, bob_token)["unread_notifications"] == 1
+        assert _total_notifications(bob.id) == 2
+
+        client.cookies.set("access_token", bob_token)
+        client.delete("/api/v1/notifications")
+
+        assert _counts(client, bob_token)["unread_notifications"] == 0
+        assert _total_notifications(bob.id) == 0
+
+    def test_delete_all_subtracts_only_deleted_unread(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that delete-all leaves counts for notifications it did not delete."""
+        bob = create_test_user("bob", "password123")
+        bob_token = get_auth_token("bob")
+        _create_notification_sync(bob.id, "new_message")
+        _create_notification_sync(bob.id, "new_message", is_read=True)
+        _reconcile([bob.id])
+        # Stands in for a notification committed after the DELETE's snapshot
+        session = SyncTestingSessionLocal()
+        try:
+            session.execute(
+                update(UserCounters)
+                .where(UserCounters.user_id == bob.id)
+                .values(unread_notifications=UserCounters.unread_notifications + 1)
+            )
+            session.commit()
+        finally:
+            session.close()
+
+        client.cookies.set("access_token", bob_token)
+        response = client.delete("/api/v1/notifications")
+
+        assert response.json()["deleted"] == 2
+        assert _counts(client, bob_token)["unread_notifications"] == 1
+
+    def test_bulk_notification_reads_move_counter(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that mark-list-read and mark-all-read lower the counter by what changed."""
+        bob = create_test_user("bob", "password123")
+        bob_token = get_auth_token("bob")
+        for name in ("alice", "carol", "dave"):
+            create_test_user(name, "password123")
+            _send(client, get_auth_token(name), bob.id)
+        client.cookies.set("access_token", bob_token)
+        ids = [n["id"] for n in client.get("/api/v1/notifications").json()["notifications"]]
+
+        client.post("/api/v1/notifications/read", json={"notification_ids": ids[:1] * 2})
+        assert _counts(client, bob_token)["unread_notifications"] == 2
+
+        client.cookies.set("access_token", bob_token)
+        client.post("/api/v1/notifications/read-all")
+        assert _counts(client, bob_token)["unread_notifications"] == 0
+
+
+class TestReconcileCounters:
+    """Tests for the counter repair job."""
+
+    def test_reconcile_repairs_drift(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that drifted and missing counters are recomputed and reported."""
+        alice = create_test_user("alice", "password123")
+        bob = create_test_user("bob", "password123")
+        _send(client, get_auth_token("alice"), bob.id)
+        # Written behind the counters' back
+        _create_notification_sync(alice.id, "friend_request")
+        session = SyncTestingSessionLocal()
+        try:
+            session.execute(
+                update(UserCounters)
+                .where(UserCounters.user_id == bob.id)
+                .values(unread_messages=7)
+            )
+            session.commit()
+        finally:
+            session.close()
+
+        assert _reconcile() == [alice.id, bob.id]
+        assert _counts(client, get_auth_token("bob")) == {
+            "unread_messages": 1,
+            "unread_notifications": 1,
+        }
+        assert _counts(client, get_auth_token("alice"))["unread_notifications"] == 1
+        assert _reconcile() == []
@@ -179,10 +179,10 @@ class TestDatabaseSchemaAfterMigration:
         expected_columns = [
             "id",
             "user_id",
-            "notification_type",
-            "title",
-            "message",
+            "type_code",
+            "actor_id",
             "related_id",
+            "count",
             "is_read",
             "created_at",
         ]
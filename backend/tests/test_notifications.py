@@ -3,13 +3,17 @@ Tests for notification endpoints.
 """
 
 import asyncio
+import threading
+import time
 
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.core.notifications import NEW_MESSAGE, render_notification
 from app.models import User, Notification
+from app.schemas.push import NotificationEvent
 
 
 class TestGetNotificationsEndpoint:
@@ -26,32 +30,11 @@ class TestGetNotificationsEndpoint:
         token = create_access_token(data={"sub": "user"})
         client.cookies.set("access_token", token)
 
-        # Create some notifications
-        from app.db.database import AsyncSessionLocal
-        from app.models import Notification
-
-        notif1 = Notification(
-            user_id=user.id,
-            notification_type="new_message",
-            title="New Message",
-            message="You have a new message",
-        )
-        notif2 = Notification(
-            user_id=user.id,
-            notification_type="message_read",
-            title="Message Read",
-            message="Your message was read",
-        )
-
         # Create notifications using sync session helper
         from tests.conftest import _create_notification_sync
 
-        _create_notification_sync(
-            user.id, "new_message", "New Message", "You have a new message"
-        )
-        _create_notification_sync(
-            user.id, "message_read", "Message Read", "Your message was read"
-        )
+        _create_notification_sync(user.id, "new_message")
+        _create_notification_sync(user.id, "message_read")
 
         response = client.get("/api/v1/notifications")
 
@@ -86,6 +69,118 @@ class TestGetNotificationsEndpoint:
         assert response.status_code == 401
 
 
+class TestNotificationRendering:
+    """Tests for rendering stored notifications from their templates."""
+
+    def test_text_is_rendered_with_actor_usernames(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that titles and messages come from the type, count and actor."""
+        from tests.conftest import _create_notification_sync
+
+        user = create_test_user("user", "password123")
+        alice = create_test_user("alice", "password123")
+        _create_notification_sync(user.id, "new_message", actor_id=alice.id)
+        _create_notification_sync(user.id, "message_read", actor_id=alice.id, count=3)
+        _create_notification_sync(user.id, "new_message")
+        client.cookies.set("access_token", get_auth_token("user"))
+
+        response = client.get("/api/v1/notifications")
+
+        assert [
+            (n["notification_type"], n["title"], n["message"], n["actor_id"], n["count"])
+            for n in response.json()["notifications"]
+        ] == [
+            ("new_message", "New Message", "Someone sent you a message", None, 1),
+            ("message_read", "Messages Read", "alice read 3 of your messages", alice.id, 3),
+            ("new_message", "New Message", "alice sent you a message", alice.id, 1),
+        ]
+
+    def test_unknown_type_filter_matches_nothing(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that filtering on a type without a code returns an empty page."""
+        from tests.conftest import _create_notification_sync
+
+        user = create_test_user("user", "password123")
+        _create_notification_sync(user.id, "new_message")
+        client.cookies.set("access_token", get_auth_token("user"))
+
+        response = client.get("/api/v1/notifications", params={"notification_type": "nope"})
+
+        assert response.json()["notifications"] == []
+
+
+class TestNotificationFeedPagination:
+    """Tests for paging and filtering GET /api/v1/notifications."""
+
+    def _seed(self, user_id):
+        from tests.conftest import _create_notification_sync
+
+        return [
+            _create_notification_sync(
+                user_id,
+                "new_message" if i % 2 else "message_read",
+                is_read=i % 3 == 0,
+            )
+            for i in range(7)
+        ]
+
+    def test_pages_newest_first_with_cursor(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that pages follow each other without gaps or repeats."""
+        user = create_test_user("user", "password123")
+        ids = [n.id for n in self._seed(user.id)]
+        client.cookies.set("access_token", get_auth_token("user"))
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 3}
+            if cursor:
+                params["cursor"] = cursor
+            page = client.get("/api/v1/notifications", params=params).json()
+            seen += [n["id"] for n in page["notifications"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == sorted(ids, reverse=True)
+
+    def test_filters_combine(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test the is_read, notification_type and since_seq filters."""
+        user = create_test_user("user", "password123")
+        seeded = self._seed(user.id)
+        client.cookies.set("access_token", get_auth_token("user"))
+
+        def ids(**params):
+            response = client.get("/api/v1/notifications", params=params)
+            return [n["id"] for n in response.json()["notifications"]]
+
+        unread = [n.id for n in reversed(seeded) if not n.is_read]
+        assert ids(is_read=False) == unread
+        assert ids(is_read=True) == [n.id for n in reversed(seeded) if n.is_read]
+        assert ids(is_read=False, notification_type="new_message") == [
+            n.id for n in reversed(seeded)
+            if not n.is_read and n.type_code == NEW_MESSAGE
+        ]
+        assert ids(since_seq=seeded[4].seq) == [seeded[6].id, seeded[5].id]
+        assert ids(is_read=False, limit=2) == unread[:2]
+
+    def test_invalid_cursor(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that a malformed cursor is rejected."""
+        create_test_user("user", "password123")
+        client.cookies.set("access_token", get_auth_token("user"))
+
+        response = client.get("/api/v1/notifications", params={"cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
+
+
 class TestGetNotificationEndpoint:
     """Tests for GET /api/v1/notifications/{notification_id} endpoint."""
 
@@ -100,23 +195,10 @@ class TestGetNotificationEndpoint:
         token = create_access_token(data={"sub": "user"})
         client.cookies.set("access_token", token)
 
-        # Create a notification
-        from app.db.database import AsyncSessionLocal
-        from app.models import Notification
-
-        notif = Notification(
-            user_id=user.id,
-            notification_type="new_message",
-            title="New Message",
-            message="You have a new message",
-        )
-
         # Create notification using sync session helper
         from tests.conftest import _create_notification_sync
 
-        notif = _create_notification_sync(
-            user.id, "new_message", "New Message", "You have a new message"
-        )
+        notif = _create_notification_sync(user.id, "new_message")
 
         response = client.get(f"/api/v1/notifications/{notif.id}")
 
@@ -162,23 +244,10 @@ class TestMarkNotificationAsReadEndpoint:
         token = create_access_token(data={"sub": "user"})
         client.cookies.set("access_token", token)
 
-        # Create a notification
-        from app.db.database import AsyncSessionLocal
-        from app.models import Notification
-
-        notif = Notification(
-            user_id=user.id,
-            notification_type="new_message",
-            title="New Message",
-            message="You have a new message",
-        )
-
         # Create notification using sync session helper
         from tests.conftest import _create_notification_sync
 
-        notif = _create_notification_sync(
-            user.id, "new_message", "New Message", "You have a new message"
-        )
+        notif = _create_notification_sync(user.id, "new_message")
 
         response = client.post(f"/api/v1/notifications/{notif.id}/read")
 
@@ -226,32 +295,11 @@ class TestDeleteAllNotificationsEndpoint:
         token = create_access_token(data={"sub": "user"})
         client.cookies.set("access_token", token)
 
-        # Create some notifications
-        from app.db.database import AsyncSessionLocal
-        from app.models import Notification
-
-        notif1 = Notification(
-            user_id=user.id,
-            notification_type="new_message",
-            title="New Message",
-            message="You have a new message",
-        )
-        notif2 = Notification(
-            user_id=user.id,
-            notification_type="message_read",
-            title="Message Read",
-            message="Your message was read",
-        )
-
         # Create notifications using sync session helper
         from tests.conftest import _create_notification_sync
 
-        _create_notification_sync(
-            user.id, "new_message", "New Message", "You have a new message"
-        )
-        _create_notification_sync(
-            user.id, "message_read", "Message Read", "Your message was read"
-        )
+        _create_notification_sync(user.id, "new_message")
+        _create_notification_sync(user.id, "message_read")
 
         # Verify notifications exist
         response = client.get("/api/v1/notifications")
@@ -264,6 +312,8 @@ class TestDeleteAllNotificationsEndpoint:
         data = response.json()
         assert data["message"] == "All notifications deleted"
 
+        assert data["deleted"] == 2
+
         # Verify notifications are deleted
         response = client.get("/api/v1/notifications")
         assert response.json()["total"] == 0
@@ -292,3 +342,252 @@ class TestDeleteAllNotificationsEndpoint:
         response = client.delete("/api/v1/notifications")
 
         assert response.status_code == 401
+
+
+def _end_streams_later(user_id, events=()):
+    """Once the user's stream is subscribed, publish events and then close it."""
+    from app.core.push import CLOSE_SHUTDOWN, hub
+
+    def run():
+        deadline = time.monotonic() + 5
+        while not hub.connections(user_id) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        for event in events:
+            hub.publish(user_id, event)
+        for subscription in list(hub._subscriptions.get(user_id, ())):
+            subscription._loop.call_soon_threadsafe(subscription._close, CLOSE_SHUTDOWN)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def _event_ids(body):
+    return [int(line[4:]) for line in body.splitlines() if line.startswith("id: ")]
+
+
+class TestBulkMarkNotificationsAsReadEndpoints:
+    """Tests for POST /api/v1/notifications/read-all and /read endpoints."""
+
+    def test_mark_all_read_updates_only_unread(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that mark-all-read reports how many notifications changed."""
+        from tests.conftest import _create_notification_sync
+
+        user = create_test_user("user", "password123")
+        other = create_test_user("other", "password123")
+        for i in range(3):
+            _create_notification_sync(user.id, "new_message")
+        _create_notification_sync(user.id, "new_message", is_read=True)
+        _create_notification_sync(other.id, "new_message")
+        client.cookies.set("access_token", get_auth_token("user"))
+
+        first = client.post("/api/v1/notifications/read-all")
+        second = client.post("/api/v1/notifications/read-all")
+
+        assert first.status_code == 200
+        assert first.json() == {"updated": 3}
+        assert second.json() == {"updated": 0}
+        notifications = client.get("/api/v1/notifications").json()["notifications"]
+        assert all(n["is_read"] for n in notifications)
+        client.cookies.set("access_token", get_auth_token("other"))
+        assert not client.get("/api/v1/notifications").json()["notifications"][0]["is_read"]
+
+    def test_mark_list_read_ignores_foreign_and_read_ids(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that only the caller's unread notifications in the list change."""
+        from tests.conftest import _create_notification_sync
+
+        user = create_test_user("user", "password123")
+        other = create_test_user("other", "password123")
+        mine = [_create_notification_sync(user.id, "new_message") for _ in range(3)]
+        theirs = _create_notification_sync(other.id, "new_message")
+        client.cookies.set("access_token", get_auth_token("user"))
+
+        response = client.post(
+            "/api/v1/notifications/read",
+            json={"notification_ids": [mine[0].id, mine[1].id, theirs.id, 99999]},
+        )
+        repeat = client.post(
+            "/api/v1/notifications/read", json={"notification_ids": [mine[0].id]}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"updated": 2}
+        assert repeat.json() == {"updated": 0}
+        read = {n["id"]: n["is_read"] for n in client.get("/api/v1/notifications").json()["notifications"]}
+        assert read == {mine[0].id: True, mine[1].id: True, mine[2].id: False}
+
+    def test_mark_list_read_requires_ids(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that an empty id list is rejected."""
+        create_test_user("user", "password123")
+        client.cookies.set("access_token", get_auth_token("user"))
+
+        response = client.post("/api/v1/notifications/read", json={"notification_ids": []})
+
+        assert response.status_code == 422
+
+    def test_bulk_read_unauthenticated(self, client, test_db, override_get_db):
+        """Test bulk read endpoints without authentication."""
+        assert client.post("/api/v1/notifications/read-all").status_code == 401
+        assert client.post(
+            "/api/v1/notifications/read", json={"notification_ids": [1]}
+        ).status_code == 401
+
+
+class TestNotificationStreamEndpoint:
+    """Tests for GET /api/v1/notifications/stream endpoint."""
+
+    def test_stream_pushes_live_notifications(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that notifications published while connected are streamed."""
+        from tests.conftest import _create_notification_sync
+
+        user = create_test_user("user", "password123")
+        _create_notification_sync(user.id, "new_message")
+        live = _create_notification_sync(user.id, "new_message")
+        event = NotificationEvent(notification=render_notification(live, None))
+        client.cookies.set("access_token", get_auth_token("user"))
+
+        thread = _end_streams_later(user.id, [event.model_dump(mode="json")])
+        response = client.get("/api/v1/notifications/stream")
+        thread.join()
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        # Without Last-Event-ID nothing from before the connection is replayed
+        assert _event_ids(response.text) == [live.seq]
+        assert "event: notification" in response.text
+
+    def test_stream_resumes_after_last_event_id(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that a reconnect receives only the missed notifications, once."""
+        from tests.conftest import _create_notification_sync
+
+        user = create_test_user("user", "password123")
+        other = create_test_user("other", "password123")
+        seen = _create_notification_sync(user.id, "new_message")
+        missed = [
+            _create_notification_sync(user.id, "new_message") for _ in range(2)
+        ]
+        _create_notification_sync(other.id, "new_message")
+        duplicate = NotificationEvent(
+            notification=render_notification(missed[-1], None)
+        )
+        client.cookies.set("access_token", get_auth_token("user"))
+
+        thread = _end_streams_later(user.id, [duplicate.model_dump(mode="json")])
+        response = client.get(
+            "/api/v1/notifications/stream", headers={"Last-Event-ID": str(seen.seq)}
+        )
+        thread.join()
+
+        assert _event_ids(response.text) == [n.seq for n in missed]
+
+    def test_stream_sends_heartbeats_when_idle(self):
+        """Test that an idle stream yields comment lines without new events."""
+        from app.api.notifications import _notification_events
+        from app.core.push import PushHub
+
+        async def scenario():
+            hub = PushHub(queue_size=10)
+            subscription = hub.subscribe(1, event_types=("notification",))
+            events = _notification_events(subscription, [], heartbeat=0.01)
+            first = await anext(events)
+            await events.aclose()
+            return first
+
+        assert asyncio.run(scenario()) == ": keep-alive\n\n"
+
+    def test_stream_unauthenticated(self, client, test_db, override_get_db):
+        """Test streaming notifications without authentication."""
+        response = client.get("/api/v1/notifications/stream")
+
+        assert response.status_code == 401
+
+
+class TestWaitForNotificationsEndpoint:
+    """Tests for GET /api/v1/notifications/wait endpoint."""
+
+    def test_wait_returns_existing_notifications_at_once(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that notifications above after_seq are returned without waiting."""
+        from tests.conftest import _create_notification_sync
+
+        user = create_test_user("user", "password123")
+        seen = _create_notification_sync(user.id, "new_message")
+        new = _create_notification_sync(user.id, "new_message")
+        client.cookies.set("access_token", get_auth_token("user"))
+
+        response = client.get(
+            "/api/v1/notifications/wait", params={"after_seq": seen.seq, "timeout": 5}
+        )
+
+        assert response.status_code == 200
+        assert [n["id"] for n in response.json()["notifications"]] == [new.id]
+
+    def test_wait_times_out_empty(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that an empty list is returned when nothing arrives in time."""
+        from tests.conftest import _create_notification_sync
+
+        user = create_test_user("user", "password123")
+        seen = _create_notification_sync(user.id, "new_message")
+        client.cookies.set("access_token", get_auth_token("user"))
+
+        response = client.get(
+            "/api/v1/notifications/wait", params={"after_seq": seen.seq, "timeout": 0.1}
+        )
+
+        assert response.json()["notifications"] == []
+        assert response.json()["total"] == 0
+
+    def test_wait_wakes_on_new_notification(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that a parked request returns once a notification is published."""
+        from tests.conftest import _create_notification_sync
+
+        from app.core.push import hub
+
+        user = create_test_user("user", "password123")
+        client.cookies.set("access_token", get_auth_token("user"))
+        created = []
+
+        def notify_once_parked():
+            while not hub.connections(user.id):
+                time.sleep(0.01)
+            new = _create_notification_sync(user.id, "new_message")
+            created.append(new)
+            event = NotificationEvent(notification=render_notification(new, None))
+            hub.publish(user.id, event.model_dump(mode="json"))
+
+        thread = threading.Thread(target=notify_once_parked, daemon=True)
+        thread.start()
+        response = client.get(
+            "/api/v1/notifications/wait", params={"after_seq": 0, "timeout": 10}
+        )
+        thread.join(timeout=1)
+
+        assert [n["id"] for n in response.json()["notifications"]] == [created[0].id]
+
+    def test_wait_rejects_excessive_timeout(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that timeouts beyond the configured maximum are refused."""
+        create_test_user("user", "password123")
+        client.cookies.set("access_token", get_auth_token("user"))
+
+        response = client.get(
+            "/api/v1/notifications/wait", params={"after_seq": 0, "timeout": 3600}
+        )
+
+        assert response.status_code == 422
@@ -165,10 +165,10 @@ class TestPostgreSQLSchema:
         expected_columns = [
             "id",
             "user_id",
-            "notification_type",
-            "title",
-            "message",
+            "type_code",
+            "actor_id",
             "related_id",
+            "count",
             "is_read",
             "created_at",
         ]
@@ -371,11 +371,11 @@ class TestPostgreSQLSchema:
         assert column_map["user_id"]["nullable"] is False, (
             "user_id should NOT be nullable"
         )
-        assert column_map["notification_type"]["nullable"] is False, (
-            "notification_type should NOT be nullable"
+        assert column_map["type_code"]["nullable"] is False, (
+            "type_code should NOT be nullable"
         )
-        assert column_map["title"]["nullable"] is False, "title should NOT be nullable"
-        assert column_map["message"]["nullable"] is True, "message should be nullable"
+        assert column_map["actor_id"]["nullable"] is True, "actor_id should be nullable"
+        assert column_map["count"]["nullable"] is False, "count should NOT be nullable"
         assert column_map["related_id"]["nullable"] is True, (
             "related_id should be nullable"
         )
@@ -0,0 +1,223 @@
+"""
+Tests for presence tracking and endpoints.
+"""
+
+import asyncio
+
+from app.core.config import settings
+from app.core.events import PostgresEventBus
+from app.core.presence import PresenceRegistry, _split_sightings, presence, share_sightings
+from app.models import User
+
+from tests.conftest import AsyncMockSession, SyncTestingSessionLocal
+
+
+def _flush(registry):
+    session = AsyncMockSession(SyncTestingSessionLocal())
+    try:
+        return asyncio.run(registry.flush(session))
+    finally:
+        asyncio.run(session.close())
+
+
+def _is_active(username):
+    session = SyncTestingSessionLocal()
+    try:
+        return session.query(User).filter(User.username == username).one().is_active
+    finally:
+        session.close()
+
+
+class TestPresenceRegistry:
+    """Tests for the in-memory presence registry."""
+
+    def test_heartbeat_expires_after_ttl(self, clock):
+        """Test that users go offline once their heartbeat lapses."""
+        registry = PresenceRegistry(ttl=30, clock=clock)
+        registry.heartbeat(1)
+
+        clock.now += 29
+        assert registry.is_online(1)
+        clock.now += 1
+        assert not registry.is_online(1)
+
+    def test_bulk_online_lookup(self):
+        """Test that online() returns only the users seen recently."""
+        registry = PresenceRegistry(ttl=30)
+        registry.heartbeat(1)
+        registry.heartbeat(3)
+
+        assert registry.online([1, 2, 3, 1]) == [1, 3]
+
+    def test_flush_batches_changes_into_the_users_table(
+        self, test_db, create_test_user, clock
+    ):
+        """Test that queued online/offline transitions are written in one flush."""
+        registry = PresenceRegistry(ttl=30, clock=clock)
+        online = create_test_user("onlineuser", is_active=False)
+        offline = create_test_user("offlineuser", is_active=True)
+
+        registry.heartbeat(online.id)
+        registry.heartbeat(offline.id)
+        clock.now += 20
+        registry.heartbeat(online.id)
+        clock.now += 15
+
+        assert _flush(registry) == 2
+        assert _is_active("onlineuser") is True
+        assert _is_active("offlineuser") is False
+        assert _flush(registry) == 0
+
+    def test_shared_sightings_keep_other_workers_from_expiring(
+        self, test_db, create_test_user, clock
+    ):
+        """Test that a worker no longer serving a user does not flush them offline."""
+        serving = PresenceRegistry(ttl=30, clock=clock)
+        idle = PresenceRegistry(ttl=30, clock=clock)
+        user = create_test_user("onlineuser", is_active=False)
+
+        serving.heartbeat(user.id)
+        idle.heartbeat(user.id)
+        _flush(serving)
+        _flush(idle)
+        for _ in range(3):
+            clock.now += 15
+            serving.heartbeat(user.id)
+            idle.merge_sightings(serving.take_sightings())
+
+        assert idle.is_online(user.id)
+        assert _flush(idle) == 0
+        assert _is_active("onlineuser") is True
+
+    def test_late_sighting_reverts_an_offline_write(self, test_db, create_test_user, clock):
+        """Test that a sighting arriving after an expiry queues the user online again."""
+        serving = PresenceRegistry(ttl=30, clock=clock)
+        idle = PresenceRegistry(ttl=30, clock=clock)
+        user = create_test_user("onlineuser")
+        idle.heartbeat(user.id)
+        serving.heartbeat(user.id)
+        serving.take_sightings()
+
+        clock.now += 25
+        serving.heartbeat(user.id)
+        clock.now += 10
+        assert _flush(idle) == 1
+        assert _is_active("onlineuser") is False
+
+        idle.merge_sightings(serving.take_sightings())
+
+        assert _flush(idle) == 1
+        assert _is_active("onlineuser") is True
+
+    def test_logout_elsewhere_drops_older_sightings(self, clock):
+        """Test that a user who left another worker is no longer online here."""
+        here = PresenceRegistry(ttl=30, clock=clock)
+        there = PresenceRegistry(ttl=30, clock=clock)
+        here.heartbeat(1)
+        clock.now += 5
+        there.mark_offline(1, persisted=True)
+
+        here.merge_sightings(there.take_sightings())
+
+        assert not here.is_online(1)
+
+    def test_shared_sightings_reach_the_process_registry(self, test_db, clock):
+        """Test that share_sightings publishes to the registry behind the endpoints."""
+        worker = PresenceRegistry(ttl=30, clock=clock)
+        worker.heartbeat(7)
+
+        share_sightings(worker)
+
+        assert presence.is_online(7)
+
+    def test_large_shares_fit_the_event_bus(self, clock):
+        """Test that sightings of over a thousand users split into events the bus carries."""
+        bus = PostgresEventBus(
+            dsn="postgresql://unused",
+            channel="presence_test",
+            batch_delay=0.01,
+            inline_limit=settings.EVENT_BUS_INLINE_LIMIT_BYTES,
+        )
+        here = PresenceRegistry(ttl=30, clock=clock)
+        here.heartbeat(2_000_000)
+        there = PresenceRegistry(ttl=30, clock=clock)
+        for user_id in range(1_000_000, 1_001_500):
+            there.heartbeat(user_id)
+            clock.now += 0.001
+        for user_id in range(2_000_000, 2_000_300):
+            there.mark_offline(user_id, persisted=True)
+        clock.now += 1.234
+
+        chunks = list(_split_sightings(there.take_sightings(), bus.inline_limit))
+
+        assert len(chunks) > 1
+        assert all(bus._encode_item("presence", chunk, None) is not None for chunk in chunks)
+        for chunk in chunks:
+            here.merge_sightings(chunk)
+        assert all(here.is_online(user_id) for user_id in range(1_000_000, 1_001_500))
+        assert not here.is_online(2_000_000)
+
+    def test_large_shares_reach_the_process_registry(self, test_db, clock):
+        """Test that share_sightings delivers every user of a share split into parts."""
+        worker = PresenceRegistry(ttl=30, clock=clock)
+        for user_id in range(1, 1201):
+            worker.heartbeat(user_id)
+
+        share_sightings(worker)
+
+        assert all(presence.is_online(user_id) for user_id in range(1, 1201))
+
+    def test_repeat_heartbeats_do_not_queue_writes(self, test_db, create_test_user):
+        """Test that only the offline->online transition is flushed."""
+        registry = PresenceRegistry(ttl=30)
+        user = create_test_user("onlineuser")
+
+        registry.heartbeat(user.id)
+        assert _flush(registry) == 1
+        registry.heartbeat(user.id)
+        registry.heartbeat(user.id)
+        assert _flush(registry) == 0
+
+
+class TestPresenceEndpoints:
+    """Tests for /api/v1/presence endpoints."""
+
+    def test_heartbeat_and_lookup(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that a heartbeat makes the user show up as online."""
+        alice = create_test_user("alice")
+        bob = create_test_user("bob")
+        client.cookies.set("access_token", get_auth_token("alice"))
+
+        response = client.post("/api/v1/presence/heartbeat")
+
+        assert response.status_code == 200
+        assert response.json()["user_id"] == alice.id
+
+        response = client.get(
+            "/api/v1/presence", params={"user_ids": [alice.id, bob.id]}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["online"] == [alice.id]
+
+    def test_logout_marks_user_offline(
+        self, client, test_db, override_get_db, create_test_user
+    ):
+        """Test that logout removes the user from the registry."""
+        user = create_test_user("alice", "testpass123")
+        client.post(
+            "/api/v1/auth/login", json={"username": "alice", "password": "testpass123"}
+        )
+        assert presence.is_online(user.id)
+
+        client.post("/api/v1/auth/logout")
+
+        assert not presence.is_online(user.id)
+
+    def test_heartbeat_unauthenticated(self, client, test_db, override_get_db):
+        """Test that heartbeats require authentication."""
+        response = client.post("/api/v1/presence/heartbeat")
+
+        assert response.status_code == 401
@@ -0,0 +1,55 @@
+"""
+Tests for the bulk user provisioning script.
+"""
+
+import asyncio
+
+from app.core.security import verify_password
+from app.models import User
+from app.scripts.provision_users import provision_users
+
+from tests.conftest import AsyncMockSession, SyncTestingSessionLocal
+
+
+def _provision(rows, batch_size=500):
+    session = AsyncMockSession(SyncTestingSessionLocal())
+    try:
+        return asyncio.run(provision_users(session, rows, batch_size=batch_size))
+    finally:
+        asyncio.run(session.close())
+
+
+class TestProvisionUsers:
+    """Tests for provision_users."""
+
+    def test_creates_users_in_batches(self, test_db):
+        """Test that every valid row becomes a user with a hashed password."""
+        rows = [(f"student{i}", f"password{i}") for i in range(5)]
+
+        report = _provision(rows, batch_size=2)
+
+        assert report.created == 5
+        assert report.existing == []
+        session = SyncTestingSessionLocal()
+        try:
+            users = session.query(User).order_by(User.username).all()
+            assert [u.username for u in users] == [f"student{i}" for i in range(5)]
+            assert verify_password("password3", users[3].hashed_password)
+        finally:
+            session.close()
+
+    def test_skips_existing_duplicate_and_invalid_rows(self, test_db, create_test_user):
+        """Test that re-runs and bad rows do not fail the import."""
+        create_test_user("student0")
+        rows = [
+            ("student0", "password0"),
+            ("student1", "password1"),
+            ("student1", "password1"),
+            ("x", "password2"),
+        ]
+
+        report = _provision(rows)
+
+        assert report.created == 1
+        assert report.existing == ["student0"]
+        assert report.invalid == ["x"]
@@ -0,0 +1,123 @@
+"""
+Tests for the push hub and the WebSocket endpoint.
+"""
+
+import asyncio
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.push import CLOSE_SHUTDOWN, CLOSE_SLOW_CONSUMER, PushHub
+
+
+class TestPushHub:
+    """Tests for the in-process push hub."""
+
+    def test_publish_reaches_every_connection_of_the_user(self):
+        """Test that events fan out to a user's connections only."""
+
+        async def scenario():
+            hub = PushHub(queue_size=10)
+            first, second = hub.subscribe(1), hub.subscribe(1)
+            other = hub.subscribe(2)
+
+            assert hub.publish(1, {"n": 1}) == 2
+            assert await first.get() == {"n": 1}
+            assert await second.get() == {"n": 1}
+            assert other._queue.empty()
+
+            hub.unsubscribe(first)
+            hub.unsubscribe(second)
+            assert hub.publish(1, {"n": 2}) == 0
+            assert hub.connections() == 1
+
+        asyncio.run(scenario())
+
+    def test_slow_consumer_is_disconnected(self):
+        """Test that overflowing the queue closes the connection after its backlog."""
+
+        async def scenario():
+            hub = PushHub(queue_size=2)
+            subscription = hub.subscribe(1)
+            for n in range(3):
+                hub.publish(1, {"n": n})
+
+            assert [await subscription.get() for _ in range(3)] == [
+                {"n": 0},
+                {"n": 1},
+                None,
+            ]
+            assert subscription.close_code == CLOSE_SLOW_CONSUMER
+            assert hub.dropped == 1
+
+        asyncio.run(scenario())
+
+    def test_shutdown_drains_and_refuses_new_connections(self):
+        """Test that shutdown closes connections behind their pending events."""
+
+        async def scenario():
+            hub = PushHub(queue_size=10)
+            subscription = hub.subscribe(1)
+            hub.publish(1, {"n": 1})
+            received = []
+
+            async def consume():
+                while (event := await subscription.get()) is not None:
+                    received.append(event)
+                hub.unsubscribe(subscription)
+
+            consumer = asyncio.create_task(consume())
+            await hub.shutdown(timeout=1)
+            await consumer
+
+            assert received == [{"n": 1}]
+            assert subscription.close_code == CLOSE_SHUTDOWN
+            assert hub.subscribe(2) is None
+
+        asyncio.run(scenario())
+
+
+class TestPushSocket:
+    """Tests for the /ws endpoint."""
+
+    def test_requires_authentication(self, client, test_db, override_get_db):
+        """Test that a connection without a valid cookie is refused."""
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect("/api/v1/ws"):
+                pass
+
+    def test_pushes_new_messages_and_read_receipts(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that the receiver gets the message and the sender the receipt."""
+        alice = create_test_user("alice", "password123")
+        bob = create_test_user("bob", "password123")
+        alice_token, bob_token = get_auth_token("alice"), get_auth_token("bob")
+
+        client.cookies.set("access_token", bob_token)
+        with client.websocket_connect("/api/v1/ws") as bob_socket:
+            client.cookies.set("access_token", alice_token)
+            sent = client.post(
+                "/api/v1/messages/send", json={"to_user_id": bob.id, "content": "Hi"}
+            ).json()
+
+            event = bob_socket.receive_json()
+            assert event["type"] == "new_message"
+            assert event["message"]["id"] == sent["id"]
+            assert event["message"]["content"] == "Hi"
+
+        client.cookies.set("access_token", alice_token)
+        with client.websocket_connect("/api/v1/ws") as alice_socket:
+            client.cookies.set("access_token", bob_token)
+            client.post(f"/api/v1/messages/{sent['id']}/read")
+            client.post(f"/api/v1/messages/{sent['id']}/read")
+
+            event = alice_socket.receive_json()
+            assert event["type"] == "message_read"
+            assert event["reader_id"] == bob.id
+            assert event["message_ids"] == [sent["id"]]
+
+            # The repeated read is a no-op, so nothing else was pushed
+            client.cookies.set("access_token", alice_token)
+            client.post("/api/v1/messages/send", json={"to_user_id": alice.id, "content": "Me"})
+            assert alice_socket.receive_json()["message"]["content"] == "Me"
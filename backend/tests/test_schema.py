@@ -101,10 +101,10 @@ class TestDatabaseSchema:
         expected_columns = [
             "id",
             "user_id",
-            "notification_type",
-            "title",
-            "message",
+            "type_code",
+            "actor_id",
             "related_id",
+            "count",
             "is_read",
             "created_at",
         ]
@@ -173,6 +173,53 @@ class TestDatabaseSchema:
             "users table should have index on username"
         )
 
+    def test_feed_indexes(self, test_schema_db):
+        """Test that the composite feed indexes are declared on the models."""
+        inspector = inspect(test_schema_db)
+        message_indexes = {idx["name"]: idx for idx in inspector.get_indexes("messages")}
+        notification_indexes = {
+            idx["name"]: idx for idx in inspector.get_indexes("notifications")
+        }
+
+        assert message_indexes["ix_messages_receiver_created"]["column_names"] == [
+            "receiver_id",
+            "created_at",
+            "id",
+        ]
+        assert "ix_messages_sender_created" in message_indexes
+        # SQLite reflection skips expression indexes, so check the declaration
+        pair_index = {
+            idx.name: idx for idx in Base.metadata.tables["messages"].indexes
+        }["ix_messages_pair_created"]
+        assert [str(expr) for expr in pair_index.expressions][:2] == [
+            "least(messages.sender_id, messages.receiver_id)",
+            "greatest(messages.sender_id, messages.receiver_id)",
+        ]
+        # Unread state comes from conversation_read_state, not an is_read index
+        assert "ix_messages_receiver_unread" not in message_indexes
+        # The feed pages by seq, so neither created_at nor id is indexed per user
+        assert "ix_notifications_user_created" not in notification_indexes
+        assert "ix_notifications_user_id" not in notification_indexes
+        assert notification_indexes["uq_notifications_user_seq"]["column_names"] == [
+            "user_id",
+            "seq",
+        ]
+        assert notification_indexes["uq_notifications_user_seq"]["unique"]
+        assert notification_indexes["ix_notifications_user_unread"]["column_names"] == [
+            "user_id",
+            "seq",
+        ]
+
+    def test_conversation_read_state_table(self, test_schema_db):
+        """Test that the read watermark table is keyed by (reader_id, peer_id)."""
+        inspector = inspect(test_schema_db)
+        columns = {col["name"]: col for col in inspector.get_columns("conversation_read_state")}
+        pk = inspector.get_pk_constraint("conversation_read_state")
+
+        assert set(columns) == {"reader_id", "peer_id", "last_read_message_id", "read_at"}
+        assert pk["constrained_columns"] == ["reader_id", "peer_id"]
+        assert columns["last_read_message_id"]["nullable"] is False
+
     def test_messages_table_foreign_keys(self, test_schema_db):
         """Test that messages table has correct foreign keys."""
         inspector = inspect(test_schema_db)
@@ -315,11 +362,13 @@ class TestDatabaseSchema:
         assert column_map["user_id"]["nullable"] is False, (
             "user_id should not be nullable"
         )
-        assert column_map["notification_type"]["nullable"] is False, (
-            "notification_type should not be nullable"
+        assert column_map["type_code"]["nullable"] is False, (
+            "type_code should not be nullable"
+        )
+        assert column_map["actor_id"]["nullable"] is True, (
+            "actor_id should be nullable (the actor may be deleted)"
         )
-        assert column_map["title"]["nullable"] is False, "title should not be nullable"
-        assert column_map["message"]["nullable"] is True, "message should be nullable"
+        assert column_map["count"]["nullable"] is False, "count should not be nullable"
         assert column_map["related_id"]["nullable"] is True, (
             "related_id should be nullable"
         )
@@ -0,0 +1,248 @@
+"""
+Tests for security utilities.
+"""
+
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.cache import TTLCache
+from app.core.security import (
+    PasswordHasher,
+    create_access_token,
+    decode_access_token,
+    token_cache,
+    user_cache,
+    verify_password,
+)
+
+
+class TestPasswordHasher:
+    """Tests for the off-loop bcrypt worker pool."""
+
+    def test_hash_and_verify(self):
+        """Test that hashing and verification run on the pool."""
+        hasher = PasswordHasher(max_workers=1, queue_size=1)
+        try:
+            hashed = asyncio.run(hasher.hash("testpassword123"))
+
+            assert verify_password("testpassword123", hashed)
+            assert asyncio.run(hasher.verify("testpassword123", hashed)) is True
+            assert asyncio.run(hasher.verify("wrongpassword", hashed)) is False
+            assert hasher.pending == 0
+        finally:
+            hasher.shutdown()
+
+    def test_full_queue_returns_503(self):
+        """Test that callers are rejected once the queue is full."""
+        hasher = PasswordHasher(max_workers=1, queue_size=0)
+        hasher.pending = hasher.max_pending
+
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(hasher.hash("testpassword123"))
+
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers["Retry-After"] == "1"
+
+    def test_concurrent_calls_share_the_pool(self):
+        """Test that concurrent callers within the limit all complete."""
+        hasher = PasswordHasher(max_workers=2, queue_size=2)
+
+        async def _hash_all():
+            return await asyncio.gather(*(hasher.hash(f"password{i}") for i in range(4)))
+
+        try:
+            hashes = asyncio.run(_hash_all())
+
+            assert len(set(hashes)) == 4
+            assert hasher.pending == 0
+        finally:
+            hasher.shutdown()
+
+
+class TestTTLCache:
+    """Tests for the in-process TTL/LRU cache."""
+
+    def test_get_counts_hits_and_misses(self):
+        """Test that lookups update the hit/miss counters."""
+        cache = TTLCache(max_size=10, ttl=60)
+        cache.set("alice", 1)
+
+        assert cache.get("alice") == 1
+        assert cache.get("bob") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_entries_expire_after_ttl(self, clock):
+        """Test that entries are not returned once their TTL has passed."""
+        cache = TTLCache(max_size=10, ttl=60, clock=clock)
+        cache.set("alice", 1)
+
+        clock.now += 59
+        assert cache.get("alice") == 1
+        clock.now += 1
+        assert cache.get("alice") is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the cache stays within max_size."""
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("alice", 1)
+        cache.set("bob", 2)
+        cache.get("alice")
+        cache.set("carol", 3)
+
+        assert cache.get("bob") is None
+        assert cache.get("alice") == 1
+        assert cache.get("carol") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_invalidate(self):
+        """Test that invalidated entries are dropped."""
+        cache = TTLCache(max_size=10, ttl=60)
+        cache.set("alice", 1)
+        cache.invalidate("alice")
+
+        assert cache.get("alice") is None
+
+
+class TestCurrentUserCache:
+    """Tests for caching the authenticated user in get_current_user."""
+
+    def test_repeat_requests_hit_the_cache(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that only the first request loads the user from the database."""
+        create_test_user("cacheduser")
+        client.cookies.set("access_token", get_auth_token("cacheduser"))
+
+        for _ in range(3):
+            response = client.get("/api/v1/friends")
+            assert response.status_code == 200
+
+        assert user_cache.misses == 1
+        assert user_cache.hits == 2
+
+    def test_logout_invalidates_cached_user(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that logout drops the cached row it just changed."""
+        create_test_user("cacheduser")
+        client.cookies.set("access_token", get_auth_token("cacheduser"))
+
+        client.get("/api/v1/friends")
+        assert user_cache.get("cacheduser") is not None
+
+        response = client.post("/api/v1/auth/logout")
+
+        assert response.status_code == 200
+        assert user_cache.get("cacheduser") is None
+
+    def test_status_update_invalidates_cached_user(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that a status change drops the cached row."""
+        user = create_test_user("cacheduser")
+        client.cookies.set("access_token", get_auth_token("cacheduser"))
+        client.get("/api/v1/friends")
+
+        response = client.put(
+            f"/api/v1/users/{user.id}/status", json={"is_active": False}
+        )
+
+        assert response.status_code == 200
+        assert user_cache.get("cacheduser") is None
+
+
+class TestTokenCache:
+    """Tests for memoized JWT decoding."""
+
+    @pytest.fixture(autouse=True)
+    def _clear_token_cache(self):
+        token_cache.clear()
+        yield
+        token_cache.clear()
+
+    def test_repeat_decode_hits_the_cache(self):
+        """Test that the same token is only verified once."""
+        token = create_access_token(data={"sub": "alice"})
+
+        first = decode_access_token(token)
+        second = decode_access_token(token)
+
+        assert first["sub"] == second["sub"] == "alice"
+        assert token_cache.hits == 1
+        assert token_cache.misses == 1
+
+    def test_entry_lifetime_is_bounded_by_token_expiry(self):
+        """Test that cached claims are evicted at the token's exp."""
+        token = create_access_token(
+            data={"sub": "alice"}, expires_delta=timedelta(seconds=30)
+        )
+        decode_access_token(token)
+
+        expires_at, _ = token_cache._entries[token]
+        assert expires_at <= time.monotonic() + 30
+
+    def test_expired_claims_are_never_returned(self):
+        """Test that a cached entry past its exp is re-verified and rejected."""
+        token = create_access_token(
+            data={"sub": "alice"}, expires_delta=timedelta(seconds=-1)
+        )
+        token_cache.set(token, {"sub": "alice", "exp": int(time.time()) - 1})
+
+        assert decode_access_token(token) is None
+        assert token_cache.get(token) is None
+
+    def test_invalid_token_is_not_cached(self):
+        """Test that tokens failing verification are not stored."""
+        assert decode_access_token("not-a-jwt") is None
+        assert len(token_cache) == 0
+
+
+class TestCurrentPrincipal:
+    """Tests for building the caller from token claims."""
+
+    def test_login_token_carries_user_id(
+        self, client, test_db, override_get_db, create_test_user
+    ):
+        """Test that the login cookie carries uid and iat claims."""
+        user = create_test_user("principaluser", "testpass123")
+
+        client.post(
+            "/api/v1/auth/login",
+            json={"username": "principaluser", "password": "testpass123"},
+        )
+        claims = decode_access_token(client.cookies["access_token"])
+
+        assert claims["sub"] == "principaluser"
+        assert claims["uid"] == user.id
+        assert "iat" in claims
+
+    def test_principal_endpoints_skip_user_lookup(
+        self, client, test_db, override_get_db, create_test_user
+    ):
+        """Test that a token with uid needs no user query."""
+        user = create_test_user("principaluser")
+        token = create_access_token(data={"sub": "principaluser", "uid": user.id})
+        client.cookies.set("access_token", token)
+
+        assert client.get("/api/v1/messages/inbox").status_code == 200
+        assert client.get("/api/v1/notifications").status_code == 200
+        assert user_cache.hits == 0
+        assert user_cache.misses == 0
+
+    def test_legacy_token_falls_back_to_user_lookup(
+        self, client, test_db, override_get_db, create_test_user, get_auth_token
+    ):
+        """Test that tokens without uid still resolve the caller."""
+        create_test_user("principaluser")
+        client.cookies.set("access_token", get_auth_token("principaluser"))
+
+        response = client.get("/api/v1/messages/inbox")
+
+        assert response.status_code == 200
+        assert user_cache.misses == 1
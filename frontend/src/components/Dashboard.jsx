@@ -1,6 +1,6 @@
 import { Link, Outlet } from 'react-router-dom'
 import { useEffect, useState } from 'react'
-import { authAPI, notificationsAPI } from '../utils/api'
+import { authAPI, countsAPI } from '../utils/api'
 
 function Dashboard({ username, onLogout }) {
   const [unreadCount, setUnreadCount] = useState(0)
@@ -18,10 +18,8 @@ function Dashboard({ username, onLogout }) {
   useEffect(() => {
     const loadNotificationCount = async () => {
       try {
-        const response = await notificationsAPI.get()
-        const notifications = response.data.notifications || []
-        const unread = notifications.filter(n => !n.is_read).length
-        setUnreadCount(unread)
+        const response = await countsAPI.get()
+        setUnreadCount(response.data.unread_notifications)
       } catch (err) {
         console.error('Failed to load notification count:', err)
       }
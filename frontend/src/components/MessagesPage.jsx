@@ -30,10 +30,9 @@ function MessagesPage({ username }) {
     setError('')
     setSuccess('')
     try {
-      const inboxResponse = await messagesAPI.inbox()
-      setMessages(inboxResponse.data.messages.filter(msg => 
-        msg.sender_id === friendId || msg.receiver_id === friendId
-      ))
+      const response = await messagesAPI.conversation(friendId)
+      // Newest first from the API; the chat reads oldest first
+      setMessages([...response.data.messages].reverse())
     } catch (err) {
       setError('Failed to load messages')
     }
@@ -38,8 +38,8 @@ describe('Dashboard', () => {
   })
 
   test('displays notification count badge', async () => {
-    vi.spyOn(apiUtils.notificationsAPI, 'get').mockResolvedValue({
-      data: { notifications: [{ id: 1, is_read: false }], total: 1 }
+    vi.spyOn(apiUtils.countsAPI, 'get').mockResolvedValue({
+      data: { unread_messages: 0, unread_notifications: 3 }
     })
     
     render(
@@ -49,7 +49,7 @@ describe('Dashboard', () => {
     )
     
     await waitFor(() => {
-      expect(screen.getByText('1')).toBeInTheDocument()
+      expect(screen.getByText('3')).toBeInTheDocument()
     })
   })
 })
@@ -25,6 +25,9 @@ vi.mock('../../utils/api', () => ({
   notificationsAPI: {
     get: vi.fn(),
   },
+  countsAPI: {
+    get: vi.fn(),
+  },
 }))
 
 function AppForLogoutTest() {
@@ -57,7 +60,9 @@ function AppForLogoutTest() {
 describe('Dashboard Logout Flow', () => {
   beforeEach(() => {
     vi.clearAllMocks()
-    apiUtils.notificationsAPI.get.mockResolvedValue({ data: { notifications: [], total: 0 } })
+    apiUtils.countsAPI.get.mockResolvedValue({
+      data: { unread_messages: 0, unread_notifications: 0 }
+    })
   })
 
   test('logout button is rendered in dashboard', async () => {
@@ -57,9 +57,40 @@ describe('MessagesPage', () => {
     })
   })
 
+  test('loads the selected friend\'s conversation oldest first', async () => {
+    vi.spyOn(apiUtils.friendsAPI, 'get').mockResolvedValue({ data: { friends: mockFriends } })
+    vi.spyOn(apiUtils.messagesAPI, 'conversation').mockResolvedValue({
+      data: {
+        peer_id: 2,
+        messages: [
+          { id: 5, content: 'Second', sender_id: 0, receiver_id: 2, created_at: '2024-01-01T12:05:00Z' },
+          { id: 4, content: 'First', sender_id: 2, receiver_id: 0, created_at: '2024-01-01T12:00:00Z' },
+        ],
+      },
+    })
+
+    render(
+      <MemoryRouter>
+        <MessagesPage username="currentUser" />
+      </MemoryRouter>
+    )
+
+    await waitFor(() => {
+      expect(screen.getByText('friend2')).toBeInTheDocument()
+    })
+
+    await act(async () => {
+      screen.getByText('friend2').click()
+    })
+
+    expect(apiUtils.messagesAPI.conversation).toHaveBeenCalledWith(2)
+    const contents = screen.getAllByText(/First|Second/).map(node => node.textContent)
+    expect(contents).toEqual(['First', 'Second'])
+  })
+
   test('calls API to send message when form submitted', async () => {
     vi.spyOn(apiUtils.friendsAPI, 'get').mockResolvedValue({ data: { friends: mockFriends } })
-    vi.spyOn(apiUtils.messagesAPI, 'inbox').mockResolvedValue({ data: { messages: [] } })
+    vi.spyOn(apiUtils.messagesAPI, 'conversation').mockResolvedValue({ data: { messages: [] } })
     vi.spyOn(apiUtils.messagesAPI, 'send').mockResolvedValue({ data: { id: 3, content: 'Test message' } })
     
     render(
@@ -97,7 +128,7 @@ describe('MessagesPage', () => {
       }
     }
     vi.spyOn(apiUtils.friendsAPI, 'get').mockResolvedValue({ data: { friends: mockFriends } })
-    vi.spyOn(apiUtils.messagesAPI, 'inbox').mockResolvedValue({ data: { messages: [] } })
+    vi.spyOn(apiUtils.messagesAPI, 'conversation').mockResolvedValue({ data: { messages: [] } })
     vi.spyOn(apiUtils.messagesAPI, 'send').mockRejectedValue(errorResponse)
     
     render(
@@ -129,7 +160,7 @@ describe('MessagesPage', () => {
 
   test('clears input after successful message send', async () => {
     vi.spyOn(apiUtils.friendsAPI, 'get').mockResolvedValue({ data: { friends: mockFriends } })
-    vi.spyOn(apiUtils.messagesAPI, 'inbox').mockResolvedValue({ data: { messages: [] } })
+    vi.spyOn(apiUtils.messagesAPI, 'conversation').mockResolvedValue({ data: { messages: [] } })
     vi.spyOn(apiUtils.messagesAPI, 'send').mockResolvedValue({ data: { id: 3, content: 'Test message' } })
     
     render(
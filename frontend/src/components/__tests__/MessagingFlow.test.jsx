@@ -20,6 +20,7 @@ vi.mock('../../utils/api', () => ({
     send: vi.fn(),
     inbox: vi.fn(),
     outbox: vi.fn(),
+    conversation: vi.fn(),
   },
 }))
 
@@ -35,7 +36,7 @@ describe('Messaging Flow - E2E', () => {
 
   test('selecting friend in MessagesPage navigates to ChatInterface with correct friend', async () => {
     apiUtils.friendsAPI.get.mockResolvedValue({ data: { friends: mockFriends } })
-    apiUtils.messagesAPI.inbox.mockResolvedValue({ data: { messages: [] } })
+    apiUtils.messagesAPI.conversation.mockResolvedValue({ data: { messages: [] } })
     
     render(
       <MemoryRouter>
@@ -58,7 +59,7 @@ describe('Messaging Flow - E2E', () => {
 
   test('sending message in ChatInterface clears input and calls API', async () => {
     apiUtils.friendsAPI.get.mockResolvedValue({ data: { friends: mockFriends } })
-    apiUtils.messagesAPI.inbox.mockResolvedValue({ data: { messages: [] } })
+    apiUtils.messagesAPI.conversation.mockResolvedValue({ data: { messages: [] } })
     apiUtils.messagesAPI.send.mockResolvedValue({ 
       data: { id: 2, content: 'Test message' } 
     })
@@ -144,7 +145,7 @@ describe('Messaging Flow - E2E', () => {
 
   test('messages flow from dashboard through friend selection', async () => {
     apiUtils.friendsAPI.get.mockResolvedValue({ data: { friends: mockFriends } })
-    apiUtils.messagesAPI.inbox.mockResolvedValue({ data: { messages: [] } })
+    apiUtils.messagesAPI.conversation.mockResolvedValue({ data: { messages: [] } })
     
     render(
       <MemoryRouter>
@@ -164,7 +165,7 @@ describe('Messaging Flow - E2E', () => {
 
   test('selecting bob navigates to ChatInterface with bob', async () => {
     apiUtils.friendsAPI.get.mockResolvedValue({ data: { friends: mockFriends } })
-    apiUtils.messagesAPI.inbox.mockResolvedValue({ data: { messages: [] } })
+    apiUtils.messagesAPI.conversation.mockResolvedValue({ data: { messages: [] } })
     
     render(
       <MemoryRouter>
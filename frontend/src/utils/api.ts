@@ -26,6 +26,7 @@ export const messagesAPI = {
     api.post('/messages/send', { to_user_id: toUserId, content }),
   inbox: () => api.get('/messages/inbox'),
   outbox: () => api.get('/messages/outbox'),
+  conversation: (peerId: number) => api.get(`/messages/conversation/${peerId}`),
   markAsRead: (messageId: number) => api.post(`/messages/${messageId}/read`),
 }
 
@@ -33,4 +34,8 @@ export const notificationsAPI = {
   get: () => api.get('/notifications'),
 }
 
+export const countsAPI = {
+  get: () => api.get('/counts'),
+}
+
 export default api
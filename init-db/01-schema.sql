@@ -27,14 +27,45 @@ CREATE TABLE IF NOT EXISTS messages (
 CREATE TABLE IF NOT EXISTS notifications (
     id SERIAL PRIMARY KEY,
     user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-    notification_type VARCHAR(100) NOT NULL,
-    title VARCHAR(255) NOT NULL,
-    message TEXT,
+    type_code SMALLINT NOT NULL,  -- Text is rendered from per-type templates
+    actor_id INTEGER REFERENCES users(id) ON DELETE SET NULL,
     related_id INTEGER,
+    count INTEGER NOT NULL DEFAULT 1,
+    seq INTEGER NOT NULL,  -- Per-user feed and stream order (user_counters.notification_seq)
     is_read BOOLEAN DEFAULT FALSE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Create conversation_read_state table (read watermark per reader and peer)
+CREATE TABLE IF NOT EXISTS conversation_read_state (
+    reader_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    peer_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    last_read_message_id INTEGER NOT NULL,
+    read_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (reader_id, peer_id)
+);
+
+-- Create conversations table (per-user summary: last message and unread count per peer)
+CREATE TABLE IF NOT EXISTS conversations (
+    owner_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    peer_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    last_message_id INTEGER NOT NULL,
+    last_sender_id INTEGER NOT NULL,
+    last_message_preview TEXT NOT NULL,
+    last_message_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    unread_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (owner_id, peer_id)
+);
+
+-- Create user_counters table (unread badges, maintained alongside messages and notifications)
+CREATE TABLE IF NOT EXISTS user_counters (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    unread_messages INTEGER NOT NULL DEFAULT 0,
+    unread_notifications INTEGER NOT NULL DEFAULT 0,
+    total_notifications INTEGER NOT NULL DEFAULT 0,
+    notification_seq INTEGER NOT NULL DEFAULT 0
+);
+
 -- Create friendships table (many-to-many, symmetric)
 CREATE TABLE IF NOT EXISTS friendships (
     id SERIAL PRIMARY KEY,
@@ -45,9 +76,19 @@ CREATE TABLE IF NOT EXISTS friendships (
     UNIQUE(user1_id, user2_id)
 );
 
--- Create indexes for common queries
-CREATE INDEX IF NOT EXISTS idx_messages_sender ON messages(sender_id);
-CREATE INDEX IF NOT EXISTS idx_messages_receiver ON messages(receiver_id);
-CREATE INDEX IF NOT EXISTS idx_notifications_user ON notifications(user_id);
-CREATE INDEX IF NOT EXISTS idx_friendships_user1 ON friendships(user1_id);
-CREATE INDEX IF NOT EXISTS idx_friendships_user2 ON friendships(user2_id);
+-- Create indexes for common queries (keep in sync with app/models and migrations)
+-- Inbox / outbox pages: one party, newest first
+CREATE INDEX IF NOT EXISTS ix_messages_receiver_created ON messages(receiver_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_messages_sender_created ON messages(sender_id, created_at DESC, id DESC);
+-- Unread recount for one conversation: rows above the reader's watermark
+CREATE INDEX IF NOT EXISTS ix_messages_receiver_sender_id ON messages(receiver_id, sender_id, id);
+-- Conversation history: both directions of a user pair, newest first
+CREATE INDEX IF NOT EXISTS ix_messages_pair_created ON messages(LEAST(sender_id, receiver_id), GREATEST(sender_id, receiver_id), created_at DESC, id DESC);
+-- Conversation list: most recent first
+CREATE INDEX IF NOT EXISTS ix_conversations_owner_recent ON conversations(owner_id, last_message_at DESC, peer_id DESC);
+-- Notification feed (newest first), stream resume and unread badge
+CREATE UNIQUE INDEX IF NOT EXISTS uq_notifications_user_seq ON notifications(user_id, seq DESC);
+CREATE INDEX IF NOT EXISTS ix_notifications_user_unread ON notifications(user_id, seq DESC) WHERE is_read = FALSE;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_notifications_unread_new_message ON notifications(user_id, actor_id) WHERE is_read = FALSE AND type_code = 1;
+-- Reverse friendship lookups (the unique constraint already leads with user1_id)
+CREATE INDEX IF NOT EXISTS ix_friendships_user2_user1 ON friendships(user2_id, user1_id);